@@ -0,0 +1,15 @@
+# app/_env.py
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv, find_dotenv
+
+
+@lru_cache(maxsize=1)
+def ensure_env_loaded() -> None:
+    """
+    Load .env once; later calls are no-ops. Set AI_TUTOR_DOTENV to the file's
+    path to skip the directory search (find_dotenv) entirely.
+    """
+    path = os.environ.get("AI_TUTOR_DOTENV") or find_dotenv(usecwd=True) or find_dotenv()
+    load_dotenv(path, override=True)
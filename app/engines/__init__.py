@@ -1,7 +1,8 @@
-from dotenv import load_dotenv, find_dotenv
+from app._env import ensure_env_loaded
 
-path = find_dotenv(usecwd=True) or find_dotenv()
-load_dotenv(path, override=True)
+# The only place the engines load .env: this runs before any engine module
+# is imported, so the modules themselves just read os.getenv().
+ensure_env_loaded()
 
 # Optional: package-level state (NO self here)
 _STATE = {
@@ -1,13 +1,8 @@
 # app/engines/cloud_stt_azure.py
-import os, threading
+import os
+import threading
 from typing import Callable, Optional, Literal
 
-try:
-    from dotenv import load_dotenv, find_dotenv
-    load_dotenv(find_dotenv())
-except Exception:
-    pass
-
 import azure.cognitiveservices.speech as speechsdk
 
 Mode = Literal["auto", "tr-TR", "en-US"]
@@ -39,45 +34,102 @@ class AzureSTTEngine:
         # Audio from default microphone
         self._audio_config = speechsdk.audio.AudioConfig(use_default_microphone=True)
 
+        # Pronunciation Assessment (en-US only): built once, applied per recognizer.
+        # Unscripted (no reference text), phoneme-level, 0–100 scale
+        self._pa_en = speechsdk.PronunciationAssessmentConfig(
+            reference_text="",  # unscripted speaking scenario
+            grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
+            granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
+            enable_miscue=False,
+        )
+        # Prosody only available for en-US; safe to enable here.
+        try:
+            self._pa_en.enable_prosody_assessment()
+        except Exception:
+            pass
+        self._pa_config = None
+
         # Build recognizer (language set in _apply_mode)
         self._recognizer: Optional[speechsdk.SpeechRecognizer] = None
+        # One recognizer (+ PA config) per mode, kept alive across switches
+        self._recognizers: dict = {}
         self._cb: Optional[Callable] = None
         self._running = False
+        # Mode switches stop the old recognizer on a worker thread. The lock
+        # keeps _recognizer from being swapped while it is running.
+        self._lock = threading.Lock()
+        self._switch_stop = None  # stop() future of a switch still in progress
+        self._resume_cb: Optional[Callable] = None  # restart with this when it is done
 
         self._build_recognizer()  # with default mode
 
     # ---------------- public API ----------------
     def set_mode(self, mode: Mode):
-        """Switch among 'auto', 'tr-TR', 'en-US'. Rebuilds recognizer safely."""
+        """Switch among 'auto', 'tr-TR', 'en-US'. Reuses the mode's recognizer if built before."""
         if mode not in ("auto", "tr-TR", "en-US"):
             return
-        self._mode = mode
-        rebuild_while_running = self._running
-        if rebuild_while_running:
-            self.stop()
-        self._build_recognizer()
-        if rebuild_while_running:
-            self.start(self._cb)
+        with self._lock:
+            self._mode = mode
+            if not self._running:
+                if self._switch_stop is None:  # else the pending switch builds it
+                    self._build_recognizer()
+                return
+
+            # The old recognizer has to stop before the new one starts; wait for
+            # that on a worker thread, not the caller's (UI) thread
+            self._running = False
+            stop_fut = self._recognizer.stop_continuous_recognition_async()
+            self._switch_stop = stop_fut
+            self._resume_cb = self._cb
+
+        threading.Thread(target=self._finish_switch, args=(stop_fut,), name="stt-switch", daemon=True).start()
 
     def start(self, callback: Callable[[str, bool, list], None]):
-        if self._running:
-            return
-        self._cb = callback
-        self._running = True
-        def _run():
-            self._recognizer.start_continuous_recognition()
-        threading.Thread(target=_run, daemon=True).start()
+        with self._lock:
+            if self._running:
+                return
+            self._resume_cb = None
+            if self._switch_stop is not None:
+                # A mode switch is still stopping the old recognizer: finish it here
+                stop_fut, self._switch_stop = self._switch_stop, None
+                stop_fut.get()
+                self._build_recognizer()
+            return self._start_locked(callback)
 
     def stop(self):
-        if not self._running:
-            return
-        self._running = False
-        def _stop():
-            self._recognizer.stop_continuous_recognition()
-        threading.Thread(target=_stop, daemon=True).start()
+        with self._lock:
+            self._resume_cb = None
+            if not self._running:
+                return None
+            self._running = False
+            return self._recognizer.stop_continuous_recognition_async()
 
     # ---------------- internals ----------------
+    def _start_locked(self, callback: Callable[[str, bool, list], None]):
+        self._cb = callback
+        self._running = True
+        # Non-blocking: returns a ResultFuture
+        return self._recognizer.start_continuous_recognition_async()
+
+    def _finish_switch(self, stop_fut):
+        """Worker side of set_mode: swap recognizers once the old one has stopped."""
+        stop_fut.get()
+        with self._lock:
+            if self._switch_stop is not stop_fut:
+                return  # start() already finished this switch
+            self._switch_stop = None
+            self._build_recognizer()
+            callback, self._resume_cb = self._resume_cb, None
+            if callback is not None:  # stop() was not called meanwhile
+                self._start_locked(callback)
+
     def _build_recognizer(self):
+        # Reuse the recognizer of this mode: its connection is already warm
+        cached = self._recognizers.get(self._mode)
+        if cached is not None:
+            self._recognizer, self._pa_config = cached
+            return
+
         # Create a new recognizer for current mode
         cfg = self._speech_config
         # Reset language-related properties
@@ -116,22 +168,22 @@ class AzureSTTEngine:
 
         # Apply Pronunciation Assessment only in en-US mode
         if self._mode == "en-US":
-            # Unscripted (no reference text), phoneme-level, 0–100 scale
-            self._pa_config = speechsdk.PronunciationAssessmentConfig(
-                reference_text="",  # unscripted speaking scenario
-                grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
-                granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
-                enable_miscue=False,
-            )
-            # Prosody only available for en-US; safe to enable here.
-            try:
-                self._pa_config.enable_prosody_assessment()
-            except Exception:
-                pass
+            self._pa_config = self._pa_en
             self._pa_config.apply_to(self._recognizer)
         else:
             self._pa_config = None
 
+        self._recognizers[self._mode] = (self._recognizer, self._pa_config)
+        self._prewarm(self._recognizer)
+
+    @staticmethod
+    def _prewarm(recognizer: speechsdk.SpeechRecognizer):
+        """Open the service connection now so the handshake isn't paid when the user speaks."""
+        try:
+            speechsdk.Connection.from_recognizer(recognizer).open(True)
+        except Exception as e:
+            print("[AzureSTT] prewarm failed:", e)
+
     # --------------- Azure events -> unified callback ---------------
     def _on_partial(self, evt: speechsdk.SpeechRecognitionEventArgs):
         if not self._cb: return
@@ -158,8 +210,6 @@ class AzureSTTEngine:
             try:
                 # SDK object for overall / word-level scores
                 pa = speechsdk.PronunciationAssessmentResult(res)
-                # Per-word result list is available via the JSON payload
-                raw_json = res.properties.get(speechsdk.PropertyId.SpeechServiceResponse_JsonResult)
                 # Minimal payload for UI: overall scores in a dict (attached to words)
                 words = [{
                     "_pa_overall": {
@@ -2,17 +2,135 @@
 # MERGED VERSION: Groq PRIMARY + Gemini fallback (reversed for speed)
 
 import os
+import copy
 import json
+import atexit
+import queue
+import re
+import socket
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 
 try:
-    from dotenv import load_dotenv, find_dotenv
-    load_dotenv(find_dotenv())
-except Exception:
-    pass
+    import orjson  # optional, much faster JSON encode/decode
+except ImportError:
+    orjson = None
 
-from app.services.db_supabase import add_learning_event, get_recent_learning_events
+from app.services.db_supabase import (
+    add_learning_events_bulk,
+    current_user_id,
+    get_recent_learning_events,
+)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# A fenced block somewhere inside a reply ("Here you go: ```json ... ```")
+_FENCE_RE = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+
+# Static instructions go in the system slot, byte-identical on every call,
+# so providers can reuse the cached prompt prefix. Only the user turn varies.
+TUTOR_SYSTEM_PROMPT = (
+    "You are an AI language tutor. "
+    "Explain grammar and vocabulary clearly, give examples, "
+    "and keep a friendly, encouraging tone."
+)
+
+GRAMMAR_CHECK_PROMPT = """
+You are a grammar correction engine for English learners.
+Return ONLY JSON.
+
+TASK:
+- Analyze the user sentence.
+- Correct grammar/spelling mistakes.
+- Ignore capitalization and whitespace issues. Only REAL mistakes matter.
+- Return a JSON with:
+  "original": string (the original sentence),
+  "corrected": string (the fully corrected sentence),
+  "errors": a list of objects with:
+      "original": wrong word/phrase,
+      "suggestion": corrected form,
+      "start": index in original text,
+      "end": index in original text.
+
+NO explanations. NO text outside JSON.
+""".strip()
+
+
+@lru_cache(maxsize=8)
+def _groq_system_message(system: str) -> dict:
+    """Shared (never mutated) system message for a static prompt."""
+    return {"role": "system", "content": system}
+
+
+@lru_cache(maxsize=8)
+def _gemini_system_instruction(system: str) -> dict:
+    """Shared (never mutated) systemInstruction for a static prompt."""
+    return {"parts": [{"text": system}]}
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class ReplyInterrupted(Exception):
+    """A streamed reply broke off after some of it had already been yielded."""
+
+
+class _LowLatencyAdapter(HTTPAdapter):
+    """HTTPAdapter with Nagle off and TCP keep-alive on the pooled sockets."""
+
+    SOCKET_OPTIONS = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.SOCKET_OPTIONS
+        return super().init_poolmanager(*args, **kwargs)
+
+
+# One pooled session for every engine instance, so consecutive calls (and
+# the UI's second engine) reuse warm TLS connections to Groq and Gemini.
+_HTTP = requests.Session()
+_HTTP.mount("https://", _LowLatencyAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+
+
+class _TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Take one token, sleeping (outside the lock) until it is available.
+        The balance may go negative so parallel callers queue up in order.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
 
 
 class GeminiEngine:
@@ -23,7 +141,7 @@ class GeminiEngine:
     3. Groq as PRIMARY (fast), Gemini as fallback
     """
 
-    GRAMMAR_CATEGORIES = [
+    GRAMMAR_CATEGORIES: tuple[str, ...] = (
         "verb_tense",
         "subject_verb_agreement",
         "articles",
@@ -35,7 +153,103 @@ class GeminiEngine:
         "spelling",
         "punctuation",
         "other",
-    ]
+    )
+    _CATEGORIES_SET = frozenset(GRAMMAR_CATEGORIES)
+
+    # Inputs that never get a grammar-analysis call
+    MIN_GRAMMAR_WORDS = 3
+    TURKISH_CHARS = frozenset("ğüşıöçĞÜŞİÖÇ")
+    GRAMMAR_CACHE_SIZE = 256
+
+    # Learning events are written in the background, in batches
+    LOG_FLUSH_INTERVAL = 0.5
+    LOG_BATCH_SIZE = 16
+    # Events are optional: while Supabase is unreachable, drop them rather
+    # than let the queue grow without bound
+    LOG_QUEUE_MAX = 500
+
+    # Static part of the _analyse_grammar prompt (system slot)
+    GRAMMAR_ANALYSIS_PROMPT = (
+        "You are an English teacher.\n"
+        "Analyse the user's sentence.\n\n"
+        "Return ONLY JSON:\n"
+        f'  "grammar_categories": array from {list(GRAMMAR_CATEGORIES)}\n'
+        '  "short_comment": max 80 chars\n\n'
+        'Example: {"grammar_categories": ["verb_tense"], "short_comment": "Past tense needs review."}'
+    )
+
+    # ask_stream(): tutor reply and grammar categories from a single call.
+    # The categories follow the reply after GRAMMAR_MARKER, so the reply
+    # itself still streams as plain text.
+    GRAMMAR_MARKER = "<<GRAMMAR>>"
+    TUTOR_STREAM_PROMPT = (
+        TUTOR_SYSTEM_PROMPT + "\n\n"
+        f"After your answer, write {GRAMMAR_MARKER} on a new line, followed by a JSON object "
+        "about the grammar of the user's own sentence:\n"
+        f'  "grammar_categories": array from {list(GRAMMAR_CATEGORIES)}\n'
+        '  "short_comment": max 80 chars\n'
+        "Write nothing after the JSON object."
+    )
+
+    # Constrained output for _analyse_grammar (Gemini responseSchema)
+    GRAMMAR_SCHEMA = {
+        "type": "OBJECT",
+        "properties": {
+            "grammar_categories": {
+                "type": "ARRAY",
+                "items": {"type": "STRING", "enum": list(GRAMMAR_CATEGORIES)},
+            },
+            "short_comment": {"type": "STRING"},
+        },
+        "required": ["grammar_categories", "short_comment"],
+    }
+
+    # Constrained output for check_grammar
+    CHECK_SCHEMA = {
+        "type": "OBJECT",
+        "properties": {
+            "original": {"type": "STRING"},
+            "corrected": {"type": "STRING"},
+            "errors": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "original": {"type": "STRING"},
+                        "suggestion": {"type": "STRING"},
+                        "start": {"type": "INTEGER"},
+                        "end": {"type": "INTEGER"},
+                    },
+                    "required": ["original", "suggestion", "start", "end"],
+                },
+            },
+        },
+        "required": ["original", "corrected", "errors"],
+    }
+
+    # Fixed parts of the learning-context prompt (FR17)
+    _CONTEXT_HEADER = "Previously, the user produced sentences like:\n"
+    _CONTEXT_FOOTER = (
+        "\n\n"
+        "When answering:\n"
+        "- Re-use similar vocabulary occasionally for retrieval practice.\n"
+        "- Briefly remind important rules if related.\n"
+        "- Keep tone supportive."
+    )
+
+    # Start Gemini as well if Groq has not answered within this many seconds
+    HEDGE_DELAY = 1.5
+
+    # Circuit breaker: after an outage-type Groq error, route everything to
+    # Gemini for this many seconds. The first call afterwards probes Groq again.
+    GROQ_COOLDOWN = 60.0
+    GROQ_TRIP_STATUSES = frozenset({401, 403, 429})
+
+    # Per-call timeouts (seconds). LLM latency has a long tail, so a stuck
+    # request is abandoned early and retried after each RETRY_BACKOFF delay.
+    REPLY_TIMEOUT = 15
+    GRAMMAR_TIMEOUT = 5
+    RETRY_BACKOFF = (0.25, 0.5)
 
     def __init__(self):
         # Try to initialize both APIs
@@ -52,6 +266,10 @@ class GeminiEngine:
         if self.groq_key:
             self.groq_model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
             self.groq_endpoint = "https://api.groq.com/openai/v1/chat/completions"
+            self._groq_headers = {
+                "Authorization": f"Bearer {self.groq_key}",
+                "Content-Type": "application/json"
+            }
             self.use_groq = True
             print("✅ Groq initialized (PRIMARY)")
         else:
@@ -65,17 +283,52 @@ class GeminiEngine:
                 f"https://generativelanguage.googleapis.com/v1beta/models/"
                 f"{model}:generateContent?key={self.gemini_key}"
             )
+            self.stream_endpoint = (
+                f"https://generativelanguage.googleapis.com/v1beta/models/"
+                f"{model}:streamGenerateContent?alt=sse&key={self.gemini_key}"
+            )
             self.use_gemini = True
             print("✅ Gemini initialized (fallback)")
         else:
             self.use_gemini = False
             print("⚠️  No Gemini key")
 
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_interval = 1.0  # Reduced since Groq is faster
-        self.groq_failed_count = 0
-        self.max_failures_before_switch = 3
+        # Rate limiting: one token bucket per provider (requests per minute)
+        self._groq_bucket = _TokenBucket(int(os.getenv("GROQ_RPM", "30")) / 60.0, capacity=5)
+        self._gemini_bucket = _TokenBucket(int(os.getenv("GEMINI_RPM", "60")) / 60.0, capacity=5)
+        self._groq_cooldown_until = 0.0
+
+        # Recent learning events behind the context prompt. Refreshed from
+        # Supabase every `context_ttl` seconds; events logged by this engine
+        # are spliced in locally so a new turn needs no extra round-trip.
+        # Keyed by user so a re-login never sees the previous user's events.
+        self._ctx_events: list[dict] | None = None
+        self._ctx_user: str | None = None
+        self._ctx_fetched_at = 0.0
+        self._ctx_built_from: list[dict] | None = None
+        self._ctx_text = ""
+        self.context_ttl = 30.0
+
+        # Recently analysed sentences -> grammar info (LRU)
+        self._grammar_cache: OrderedDict[str, dict] = OrderedDict()
+        self._check_cache: OrderedDict[str, dict] = OrderedDict()
+        self._grammar_lock = threading.Lock()
+        # Grammar calls currently running, so identical concurrent requests share one
+        self._inflight: dict[tuple[str, str], Future] = {}
+
+        # Pooled session shared by all engines (warm TLS connections)
+        self._http = _HTTP
+
+        # Learning-event writer: ask() only enqueues, a daemon thread inserts
+        self._log_q: queue.Queue = queue.Queue(maxsize=self.LOG_QUEUE_MAX)
+        threading.Thread(target=self._log_worker, name="learning-log", daemon=True).start()
+        atexit.register(self._flush_log_queue)
+
+        # Worker pool so the reply and grammar analysis run side by side
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="engine")
+        # Provider calls (the Groq/Gemini hedge) get their own pool, so they
+        # never queue behind grammar analysis on _pool
+        self._provider_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="provider")
 
     # ========================================================================
     # 1. ask() - Main tutor conversation with learning memory
@@ -85,51 +338,222 @@ class GeminiEngine:
         Main tutor conversation entry point.
         - Builds learning context from past events (FR17)
         - Gets AI response (Groq first, then Gemini fallback)
-        - Analyzes grammar categories
-        - Logs learning event (FR16)
+        - Analyzes grammar categories (in parallel with the reply)
+        - Logs learning event (FR16) in the background
         """
         # Build learning context
         context = self._build_learning_context()
-        prompt_text = context + "\n\nCurrent user message:\n" + text
+        message = "Current user message:\n" + text
 
-        # Try Groq first (PRIMARY - faster)
-        if self.use_groq and self.groq_failed_count < self.max_failures_before_switch:
-            reply = self._try_groq(prompt_text)
+        # Skipped or cached inputs return at once; otherwise both calls run together
+        fut_gram = self._pool.submit(self._analyse_grammar, text)
+        reply = self._post_reply(context, message)
+
+        # Log learning event (FR16) once the grammar analysis is done
+        self._log_after_grammar(fut_gram, text, reply, session_id)
+
+        return reply
+
+    def _log_after_grammar(self, fut_gram, text: str, reply: str, session_id: int | None):
+        """Log the turn when grammar analysis completes, without blocking the caller."""
+        def _done(fut):
+            try:
+                grammar_info = fut.result()
+            except Exception as e:
+                print(f"⚠️  Grammar analysis failed: {e}")
+                grammar_info = None
+
+            # Grammar category analysis is dropped if the reply failed
+            if reply.startswith("[") or reply.startswith("ERROR"):
+                grammar_info = {}
+
+            self._log_learning_event(
+                user_input=text,
+                reply_text=reply,
+                session_id=session_id,
+                extra=grammar_info,
+            )
+
+        fut_gram.add_done_callback(_done)
+
+    def _post_reply(self, context: str, message: str) -> str:
+        """
+        Get the tutor reply (Groq first, Gemini fallback).
+        If Groq is slow, Gemini is started after HEDGE_DELAY and the first
+        good answer wins.
+        """
+        prompt_text = f"{context}\n\n{message}" if context else message
 
-            # Check if Groq failed
-            if "[Groq error" in reply:
-                self.groq_failed_count += 1
-                print(f"⚠️  Groq failed ({self.groq_failed_count}/{self.max_failures_before_switch})")
+        # Try Groq first (PRIMARY - faster)
+        if self._groq_available():
+            fut_groq = self._provider_pool.submit(self._try_groq, prompt_text)
+            if not self.use_gemini:
+                return fut_groq.result()
 
+            done, _ = wait([fut_groq], timeout=self.HEDGE_DELAY)
+            if done:
+                reply = fut_groq.result()
+                if "[Groq error" not in reply:
+                    return reply
                 # Fall back to Gemini
-                if self.use_gemini:
-                    print("🔄 Falling back to Gemini...")
-                    reply = self._try_gemini(prompt_text)
-            else:
-                # Success - reset failure count
-                self.groq_failed_count = 0
+                print("🔄 Falling back to Gemini...")
+                return self._try_gemini(message, context=context)
 
-        # Use Gemini if Groq unavailable or failed too many times
-        elif self.use_gemini:
-            reply = self._try_gemini(prompt_text)
-        else:
-            reply = "[ERROR: No AI service available]"
+            print("⏱️  Groq is slow, racing Gemini...")
+            fut_gemini = self._provider_pool.submit(self._try_gemini, message, context=context)
+            return self._first_good_reply([fut_groq, fut_gemini])
+
+        # Use Gemini if Groq is unavailable or cooling down
+        if self.use_gemini:
+            return self._try_gemini(message, context=context)
+        return "[ERROR: No AI service available]"
 
-        # Grammar category analysis (only if not an error)
-        grammar_info = {}
-        if not reply.startswith("[") and not reply.startswith("ERROR"):
-            grammar_info = self._analyse_grammar(text, reply)
+    def _groq_available(self) -> bool:
+        """Groq is configured and its circuit is closed (or there is no fallback)."""
+        if not self.use_groq:
+            return False
+        return not self.use_gemini or time.monotonic() >= self._groq_cooldown_until
 
-        # Log learning event (FR16)
-        self._log_learning_event(
-            user_input=text,
-            reply_text=reply,
-            session_id=session_id,
-            extra=grammar_info,
-        )
+    def _open_groq_circuit(self, reason: str) -> None:
+        """Skip Groq for GROQ_COOLDOWN seconds."""
+        self._groq_cooldown_until = time.monotonic() + self.GROQ_COOLDOWN
+        print(f"⚠️  Groq failed ({reason}), skipping it for {self.GROQ_COOLDOWN:.0f}s")
 
+    def _groq_http_error(self, status: int) -> str:
+        """Error string for a non-200 Groq reply; outages open the circuit."""
+        if status >= 500 or status in self.GROQ_TRIP_STATUSES:
+            self._open_groq_circuit(f"HTTP {status}")
+        return f"[Groq error {status}]"
+
+    @staticmethod
+    def _first_good_reply(futures) -> str:
+        """Return the first non-error reply; the last error if all failed."""
+        reply = "[ERROR: No AI service available]"
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                reply = fut.result()
+                if not reply.startswith("["):
+                    # The loser keeps running on its thread; its result is ignored
+                    for other in pending:
+                        other.cancel()
+                    return reply
         return reply
 
+    def ask_stream(self, text: str, session_id: int | None = None):
+        """
+        Streaming variant of ask().
+        Yields reply text chunks as they arrive (SSE), so the UI can show
+        the first tokens right away. The learning event is logged in the
+        background after the stream.
+        Raises ReplyInterrupted if the provider fails mid-reply; the text
+        yielded so far is then incomplete.
+
+        When the input needs a new grammar analysis, the same call returns
+        the categories after GRAMMAR_MARKER (TUTOR_STREAM_PROMPT); they are
+        cut from the streamed text. Without a usable trailer,
+        _analyse_grammar runs after the stream instead.
+        """
+        context = self._build_learning_context()
+        message = "Current user message:\n" + text
+
+        key = self._grammar_key(self._learner_text(text).strip())
+        if key is None or self._lru_get(self._grammar_cache, key) is not None:
+            # Skipped or cached: _analyse_grammar returns at once
+            fut_gram = self._pool.submit(self._analyse_grammar, text)
+            chunks: list[str] = []
+            for delta in self._stream_reply(context, message):
+                chunks.append(delta)
+                yield delta
+            self._log_after_grammar(fut_gram, text, "".join(chunks), session_id)
+            return
+
+        chunks = []
+        trailer: list[str] = []
+        stream = self._stream_reply(context, message, system=self.TUTOR_STREAM_PROMPT)
+        for delta in self._cut_trailer(stream, self.GRAMMAR_MARKER, trailer):
+            chunks.append(delta)
+            yield delta
+        reply = "".join(chunks)
+
+        grammar_info = self._trailer_grammar("".join(trailer))
+        if grammar_info is not None:
+            if grammar_info:
+                self._lru_put(self._grammar_cache, key, grammar_info)
+            fut_gram = Future()
+            fut_gram.set_result(dict(grammar_info))
+        elif reply.startswith("["):
+            fut_gram = Future()
+            fut_gram.set_result({})  # provider error string
+        else:
+            fut_gram = self._pool.submit(self._analyse_grammar, text)
+        self._log_after_grammar(fut_gram, text, reply, session_id)
+
+    @staticmethod
+    def _cut_trailer(stream, marker: str, trailer: list[str]):
+        """
+        Pass the stream through up to `marker`; what follows it goes to `trailer`.
+        A tail that may be the start of the marker (or whitespace before it)
+        is held back until the next delta shows what it is.
+        """
+        buf = ""
+        for delta in stream:
+            if trailer:
+                trailer.append(delta)
+                continue
+            buf += delta
+            i = buf.find(marker)
+            if i != -1:
+                trailer.append(buf[i + len(marker):])
+                head = buf[:i].rstrip()
+                if head:
+                    yield head
+                continue
+            keep = next((n for n in range(min(len(marker) - 1, len(buf)), 0, -1)
+                         if marker.startswith(buf[-n:])), 0)
+            head = buf[:len(buf) - keep].rstrip()
+            if head:
+                yield head
+                buf = buf[len(head):]
+        if buf and not trailer:
+            yield buf
+
+    def _trailer_grammar(self, trailer: str) -> dict | None:
+        """Grammar info from the text after GRAMMAR_MARKER; None if missing or unparsable."""
+        if not trailer.strip():
+            return None
+        try:
+            obj = self._parse_json_reply(trailer.strip())
+        except Exception:
+            return None
+        return self._grammar_info(obj) if isinstance(obj, dict) else None
+
+    def _stream_reply(self, context: str, message: str, system: str = TUTOR_SYSTEM_PROMPT):
+        """Stream the tutor reply (Groq first, then Gemini fallback)."""
+        prompt_text = f"{context}\n\n{message}" if context else message
+
+        if self._groq_available():
+            stream = self._stream_groq(prompt_text, system)
+            first = next(stream, "")
+
+            if "[Groq error" in first:
+                if self.use_gemini:
+                    print("🔄 Falling back to Gemini...")
+                    yield from self._stream_gemini(message, context=context, system=system)
+                else:
+                    yield first
+                return
+
+            yield first
+            yield from stream
+            return
+
+        if self.use_gemini:
+            yield from self._stream_gemini(message, context=context, system=system)
+        else:
+            yield "[ERROR: No AI service available]"
+
     # ========================================================================
     # 2. check_grammar() - Grammar correction JSON
     # ========================================================================
@@ -150,85 +574,66 @@ class GeminiEngine:
             }
           ]
         }
-        """
-        prompt = f"""
-You are a grammar correction engine for English learners.
-Return ONLY JSON.
 
-TASK:
-- Analyze the user sentence.
-- Correct grammar/spelling mistakes.
-- Ignore capitalization and whitespace issues. Only REAL mistakes matter.
-- Return a JSON with:
-  "original": string (the original sentence),
-  "corrected": string (the fully corrected sentence),
-  "errors": a list of objects with:
-      "original": wrong word/phrase,
-      "suggestion": corrected form,
-      "start": index in original text,
-      "end": index in original text.
+        Successful results are cached per exact sentence (the error
+        offsets refer to the original text, so it is not normalised).
+        """
+        cached = self._lru_get(self._check_cache, text)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        return copy.deepcopy(self._coalesce(("check", text), lambda: self._run_check(text)))
 
-NO explanations. NO text outside JSON.
-User sentence:
-{text}
-        """.strip()
+    def _run_check(self, text: str) -> dict:
+        """One check_grammar model call; successful results are cached."""
+        raw = self._grammar_model(f"User sentence:\n{text}", GRAMMAR_CHECK_PROMPT, self.CHECK_SCHEMA)
+        if raw is None:
+            return self._grammar_error_response(text, "No AI service available")
+        if raw.startswith(("[Groq error", "[Gemini error")):
+            return self._grammar_error_response(text, raw.strip("[]"))
 
         try:
-            # Try Groq first (PRIMARY)
-            if self.use_groq and self.groq_failed_count < self.max_failures_before_switch:
-                headers = {
-                    "Authorization": f"Bearer {self.groq_key}",
-                    "Content-Type": "application/json"
-                }
-                groq_body = {
-                    "model": self.groq_model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.3
-                }
-                r = requests.post(self.groq_endpoint, json=groq_body, headers=headers, timeout=30)
-
-                if r.status_code == 200:
-                    data = r.json()
-                    raw = data["choices"][0]["message"]["content"]
-                else:
-                    # Groq failed, try Gemini
-                    if self.use_gemini:
-                        body = {"contents": [{"parts": [{"text": prompt}]}]}
-                        r = requests.post(self.endpoint, json=body, timeout=60)
-                        if r.status_code == 200:
-                            data = r.json()
-                            raw = data["candidates"][0]["content"]["parts"][0]["text"]
-                        else:
-                            return self._grammar_error_response(text, f"Error {r.status_code}")
-                    else:
-                        return self._grammar_error_response(text, f"Groq error {r.status_code}")
-
-            # Gemini fallback if no Groq
-            elif self.use_gemini:
-                body = {"contents": [{"parts": [{"text": prompt}]}]}
-                r = requests.post(self.endpoint, json=body, timeout=60)
-                if r.status_code == 200:
-                    data = r.json()
-                    raw = data["candidates"][0]["content"]["parts"][0]["text"]
-                else:
-                    return self._grammar_error_response(text, f"Error {r.status_code}")
-            else:
-                return self._grammar_error_response(text, "No AI service available")
+            result = self._check_result(self._parse_json_reply(raw), text)
+        except Exception as e:
+            return self._grammar_error_response(text, f"Parse error: {e}")
 
-            # Clean JSON fences
-            raw = self._strip_code_fence(raw)
-            result = json.loads(raw)
+        self._lru_put(self._check_cache, text, copy.deepcopy(result))
+        return result
 
-            # Validate structure
-            if "errors" not in result or not isinstance(result["errors"], list):
-                result["errors"] = []
-            result.setdefault("original", text)
-            result.setdefault("corrected", text)
+    def _grammar_model(self, prompt: str, system: str, schema: dict) -> str | None:
+        """
+        Grammar-correction call: Groq first, Gemini if Groq fails. None if no service.
+        Output is constrained to JSON (Groq JSON mode, Gemini responseSchema).
+        """
+        if self._groq_available():
+            raw = self._try_groq(
+                prompt, json_mode=True, temperature=0.3, system=system, timeout=self.GRAMMAR_TIMEOUT
+            )
+            if raw.startswith("[Groq error") and self.use_gemini:
+                raw = self._try_gemini(
+                    prompt, response_schema=schema, system=system, timeout=self.GRAMMAR_TIMEOUT
+                )
+            return raw
+        if self.use_gemini:
+            return self._try_gemini(prompt, response_schema=schema, system=system, timeout=self.GRAMMAR_TIMEOUT)
+        return None
 
-            return result
+    def _parse_json_reply(self, raw: str):
+        """Parse a JSON-mode reply; a fenced reply (model ignored JSON mode) still parses."""
+        try:
+            return _loads(raw)
+        except ValueError:
+            return _loads(self._strip_code_fence(raw))
 
-        except Exception as e:
-            return self._grammar_error_response(text, f"Parse error: {e}")
+    @staticmethod
+    def _check_result(result, text: str) -> dict:
+        """Validate a parsed correction object, filling in missing fields."""
+        if not isinstance(result, dict):
+            raise ValueError("expected a JSON object")
+        if "errors" not in result or not isinstance(result["errors"], list):
+            result["errors"] = []
+        result.setdefault("original", text)
+        result.setdefault("corrected", text)
+        return result
 
     def _grammar_error_response(self, text: str, error: str) -> dict:
         """Return a safe error response for grammar check."""
@@ -243,40 +648,60 @@ User sentence:
     # INTERNAL HELPERS
     # ========================================================================
 
-    def _try_groq(self, prompt: str) -> str:
-        """Try Groq API (PRIMARY)."""
-        headers = {
-            "Authorization": f"Bearer {self.groq_key}",
-            "Content-Type": "application/json"
-        }
+    def _try_groq(
+            self,
+            prompt: str,
+            json_mode: bool = False,
+            temperature: float = 0.7,
+            system: str = TUTOR_SYSTEM_PROMPT,
+            timeout: float | None = None,
+    ) -> str:
+        """Try Groq API (PRIMARY). json_mode forces a JSON object reply."""
         body = {
             "model": self.groq_model,
             "messages": [
-                {"role": "system", "content": "You are a helpful AI language tutor."},
+                _groq_system_message(system),
                 {"role": "user", "content": prompt}
             ],
-            "temperature": 0.7,
+            "temperature": temperature,
             "max_tokens": 2048
         }
+        if json_mode:
+            body["response_format"] = {"type": "json_object"}
         try:
-            self._rate_limit()
-            r = requests.post(self.groq_endpoint, json=body, headers=headers, timeout=30)
+            r = self._post_with_retry(
+                self.groq_endpoint, body, self._groq_headers, timeout or self.REPLY_TIMEOUT, self._groq_bucket
+            )
             if r.status_code == 200:
-                data = r.json()
+                data = _loads(r.content)
                 return data["choices"][0]["message"]["content"]
             else:
-                return f"[Groq error {r.status_code}]"
+                return self._groq_http_error(r.status_code)
         except Exception as e:
+            self._open_groq_circuit(type(e).__name__)
             return f"[Groq error: {e}]"
 
-    def _try_gemini(self, prompt: str) -> str:
-        """Try Gemini API (FALLBACK)."""
-        body = {"contents": [{"parts": [{"text": prompt}]}]}
+    def _try_gemini(
+            self,
+            prompt: str,
+            context: str = "",
+            response_schema: dict | None = None,
+            system: str = TUTOR_SYSTEM_PROMPT,
+            timeout: float | None = None,
+    ) -> str:
+        """Try Gemini API (FALLBACK). response_schema forces schema-shaped JSON."""
+        body = self._gemini_body(prompt, context, system)
+        if response_schema:
+            body["generationConfig"] = {
+                "responseMimeType": "application/json",
+                "responseSchema": response_schema,
+            }
         try:
-            self._rate_limit()
-            r = requests.post(self.endpoint, json=body, timeout=60)
+            r = self._post_with_retry(
+                self.endpoint, body, JSON_HEADERS, timeout or self.REPLY_TIMEOUT, self._gemini_bucket
+            )
             if r.status_code == 200:
-                data = r.json()
+                data = _loads(r.content)
                 return data["candidates"][0]["content"]["parts"][0]["text"]
             elif r.status_code == 429:
                 return "[Gemini error 429: Quota exceeded]"
@@ -287,46 +712,148 @@ User sentence:
         except Exception as e:
             return f"[Gemini error: {e}]"
 
-    def _rate_limit(self):
-        """Simple rate limiting."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
-        self.last_request_time = time.time()
+    def _post_with_retry(self, url: str, body: dict, headers: dict, timeout: float, bucket):
+        """POST a JSON body; a timed-out attempt is retried after each RETRY_BACKOFF delay."""
+        data = _dumps(body)
+        for delay in self.RETRY_BACKOFF:
+            bucket.acquire()
+            try:
+                return self._http.post(url, data=data, headers=headers, timeout=timeout)
+            except requests.Timeout:
+                print(f"⏱️  No response after {timeout}s, retrying in {delay}s...")
+                time.sleep(delay)
+        bucket.acquire()
+        return self._http.post(url, data=data, headers=headers, timeout=timeout)
+
+    def _stream_groq(self, prompt: str, system: str = TUTOR_SYSTEM_PROMPT):
+        """
+        Stream Groq chat completion deltas (SSE). A failure before the first
+        delta is yielded as an error string; after it, ReplyInterrupted is raised.
+        """
+        body = {
+            "model": self.groq_model,
+            "messages": [
+                _groq_system_message(system),
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 2048,
+            "stream": True,
+        }
+        started = False
+        try:
+            self._groq_bucket.acquire()
+            with self._http.post(self.groq_endpoint, data=_dumps(body), headers=self._groq_headers,
+                                 timeout=self.REPLY_TIMEOUT, stream=True) as r:
+                if r.status_code != 200:
+                    yield self._groq_http_error(r.status_code)
+                    return
+                for event in self._iter_sse(r):
+                    choices = event.get("choices") or [{}]
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        started = True
+                        yield delta
+        except Exception as e:
+            self._open_groq_circuit(type(e).__name__)
+            if started:
+                raise ReplyInterrupted(f"Groq error: {e}") from e
+            yield f"[Groq error: {e}]"
+
+    def _stream_gemini(self, prompt: str, context: str = "", system: str = TUTOR_SYSTEM_PROMPT):
+        """Stream Gemini text deltas (streamGenerateContent, SSE); errors as in _stream_groq."""
+        body = self._gemini_body(prompt, context, system)
+        started = False
+        try:
+            self._gemini_bucket.acquire()
+            with self._http.post(self.stream_endpoint, data=_dumps(body), headers=JSON_HEADERS,
+                                 timeout=self.REPLY_TIMEOUT, stream=True) as r:
+                if r.status_code == 429:
+                    yield "[Gemini error 429: Quota exceeded]"
+                    return
+                if r.status_code != 200:
+                    yield f"[Gemini error {r.status_code}]"
+                    return
+                for event in self._iter_sse(r):
+                    try:
+                        delta = event["candidates"][0]["content"]["parts"][0]["text"]
+                    except (KeyError, IndexError, TypeError):
+                        continue
+                    if delta:
+                        started = True
+                        yield delta
+        except Exception as e:
+            if started:
+                raise ReplyInterrupted(f"Gemini error: {e}") from e
+            if isinstance(e, requests.Timeout):
+                yield "[Gemini error: timeout]"
+            else:
+                yield f"[Gemini error: {e}]"
+
+    def _gemini_body(self, prompt: str, context: str = "", system: str = TUTOR_SYSTEM_PROMPT) -> dict:
+        """Gemini request body; the static instructions go in systemInstruction."""
+        text = f"{context}\n\n{prompt}" if context else prompt
+        return {
+            "systemInstruction": _gemini_system_instruction(system),
+            "contents": [{"role": "user", "parts": [{"text": text}]}],
+        }
+
+    @staticmethod
+    def _iter_sse(r):
+        """Parse `data: {...}` frames of a server-sent events response."""
+        for line in r.iter_lines():
+            if not line or not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            try:
+                yield _loads(data)
+            except ValueError:
+                continue
+
+    def _recent_events(self) -> list[dict]:
+        """Recent learning events of the current user, cached for `context_ttl` seconds."""
+        now = time.monotonic()
+        uid = current_user_id()
+        if (
+            self._ctx_events is None
+            or uid != self._ctx_user
+            or now - self._ctx_fetched_at >= self.context_ttl
+        ):
+            self._ctx_events = get_recent_learning_events(limit=5)
+            self._ctx_user = uid
+            self._ctx_fetched_at = now
+        return self._ctx_events
 
     def _build_learning_context(self) -> str:
-        """FR17: Build context from past learning events."""
-        events = get_recent_learning_events(limit=5)
+        """
+        FR17: Build context from past learning events.
+        Only the per-user part; the static tutor persona is TUTOR_SYSTEM_PROMPT.
+        Empty when there is no history yet. Rebuilt only when the cached
+        events change.
+        """
+        events = self._recent_events()
         if not events:
-            return (
-                "You are an AI language tutor. "
-                "Explain grammar and vocabulary clearly, give examples, "
-                "and keep a friendly, encouraging tone."
-            )
+            return ""
+        if events is self._ctx_built_from:
+            return self._ctx_text
 
+        seen: set[str] = set()
         sentences: list[str] = []
         for e in events:
             payload = e.get("payload") or {}
             last_input = payload.get("last_input")
-            if last_input and last_input not in sentences:
+            if last_input and last_input not in seen:
+                seen.add(last_input)
                 sentences.append(last_input)
 
-        if not sentences:
-            return (
-                "You are an AI language tutor. "
-                "Explain grammar and vocabulary clearly."
-            )
-
-        bullet_lines = "\n".join(f"- {s}" for s in sentences)
-        return (
-            "You are an AI language tutor.\n"
-            "Previously, the user produced sentences like:\n"
-            f"{bullet_lines}\n\n"
-            "When answering:\n"
-            "- Re-use similar vocabulary occasionally for retrieval practice.\n"
-            "- Briefly remind important rules if related.\n"
-            "- Keep tone supportive."
-        )
+        text = ""
+        if sentences:
+            text = "".join([self._CONTEXT_HEADER, "- ", "\n- ".join(sentences), self._CONTEXT_FOOTER])
+        self._ctx_built_from = events
+        self._ctx_text = text
+        return text
 
     def _normalise_categories(self, cats) -> list[str]:
         """Normalize grammar categories."""
@@ -339,58 +866,134 @@ User sentence:
             if not isinstance(c, str):
                 continue
             c = c.strip().lower().replace(" ", "_")
-            if c in self.GRAMMAR_CATEGORIES:
+            if c in self._CATEGORIES_SET:
                 out.append(c)
         return list(dict.fromkeys(out))
 
     def _strip_code_fence(self, text: str) -> str:
-        """Strip ```json fences."""
+        """Strip ```json fences (also when the model wrote prose around the block)."""
         s = text.strip()
         if not s.startswith("```"):
-            return s
-        lines = s.splitlines()
-        if len(lines) >= 2 and lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].startswith("```"):
-            lines = lines[:-1]
-        return "\n".join(lines).strip()
-
-    def _analyse_grammar(self, user_input: str, reply_text: str) -> dict:
+            m = _FENCE_RE.search(s) if "```" in s else None
+            return m.group(1).strip() if m else s
+        # Slice between the opening fence line and the closing fence
+        i = s.find("\n")
+        if i == -1:
+            return ""
+        j = s.rfind("```")
+        if j <= i:
+            return s[i + 1:].strip()  # no closing fence
+        return s[i + 1:j].strip()
+
+    @staticmethod
+    def _learner_text(text: str) -> str:
+        """Drop the [TOPIC ...]/[STYLE ...] blocks the UIs put before the user text."""
+        if text.startswith("[") and "\n\n" in text:
+            return text.rsplit("\n\n", 1)[1]
+        return text
+
+    def _looks_turkish(self, text: str) -> bool:
+        return any(c in self.TURKISH_CHARS for c in text)
+
+    def _analyse_grammar(self, user_input: str) -> dict:
         """
         Grammar category detection.
         Returns grammar_categories and short_comment.
+        Skips very short or Turkish inputs and reuses results for sentences
+        analysed recently.
         """
-        prompt = (
-            "You are an English teacher.\n"
-            f"Analyse: \"{user_input}\"\n\n"
-            "Return ONLY JSON:\n"
-            f'  "grammar_categories": array from {self.GRAMMAR_CATEGORIES}\n'
-            '  "short_comment": max 80 chars\n\n'
-            'Example: {"grammar_categories": ["verb_tense"], "short_comment": "Past tense needs review."}'
-        )
-
-        # Use Groq first (PRIMARY)
-        if self.use_groq and self.groq_failed_count < self.max_failures_before_switch:
-            response = self._try_groq(prompt)
+        user_input = self._learner_text(user_input).strip()
+        key = self._grammar_key(user_input)
+        if key is None:
+            return {}
+
+        cached = self._lru_get(self._grammar_cache, key)
+        if cached is not None:
+            return dict(cached)
+
+        out = self._coalesce(("analyse", key), lambda: self._request_grammar_analysis(user_input))
+        if out is not None:
+            self._lru_put(self._grammar_cache, key, out)
+            return dict(out)
+        return {}
+
+    def _coalesce(self, key: tuple[str, str], fn):
+        """
+        Run fn() once for concurrent callers with the same key; the others
+        wait for and share its result (callers copy it before handing it out).
+        """
+        with self._grammar_lock:
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+        if not owner:
+            return fut.result()
+
+        try:
+            result = fn()
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._grammar_lock:
+                del self._inflight[key]
+
+    def _grammar_key(self, user_input: str) -> str | None:
+        """Grammar-cache key for a learner sentence; None if it is never analysed."""
+        if len(user_input.split()) < self.MIN_GRAMMAR_WORDS or self._looks_turkish(user_input):
+            return None
+        return " ".join(user_input.lower().split())
+
+    def _lru_get(self, cache: OrderedDict, key: str):
+        """Look up key in one of the grammar caches, marking it recently used."""
+        with self._grammar_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def _lru_put(self, cache: OrderedDict, key: str, value) -> None:
+        """Store value in one of the grammar caches, evicting the oldest entry."""
+        with self._grammar_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            if len(cache) > self.GRAMMAR_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    def _request_grammar_analysis(self, user_input: str) -> dict | None:
+        """Ask the model for grammar categories; None if the call/parse failed."""
+        prompt = f"Analyse: \"{user_input}\""
+        system = self.GRAMMAR_ANALYSIS_PROMPT
+
+        # Use Groq first (PRIMARY); both providers are asked for strict JSON
+        if self._groq_available():
+            response = self._try_groq(prompt, json_mode=True, system=system, timeout=self.GRAMMAR_TIMEOUT)
         elif self.use_gemini:
-            response = self._try_gemini(prompt)
+            response = self._try_gemini(
+                prompt, response_schema=self.GRAMMAR_SCHEMA, system=system, timeout=self.GRAMMAR_TIMEOUT
+            )
         else:
-            return {}
+            return None
 
         try:
-            cleaned = self._strip_code_fence(response)
-            obj = json.loads(cleaned)
-            cats = self._normalise_categories(obj.get("grammar_categories"))
-            comment = obj.get("short_comment")
-
-            out: dict = {}
-            if cats:
-                out["grammar_categories"] = cats
-            if isinstance(comment, str) and comment.strip():
-                out["grammar_comment"] = comment.strip()[:120]
-            return out
+            return self._grammar_info(_loads(response))
         except Exception:
-            return {}
+            return None
+
+    def _grammar_info(self, obj: dict) -> dict:
+        """grammar_categories / grammar_comment fields from a model JSON object."""
+        cats = self._normalise_categories(obj.get("grammar_categories"))
+        comment = obj.get("short_comment")
+
+        out: dict = {}
+        if cats:
+            out["grammar_categories"] = cats
+        if isinstance(comment, str) and comment.strip():
+            out["grammar_comment"] = comment.strip()[:120]
+        return out
 
     def _log_learning_event(
             self,
@@ -399,9 +1002,11 @@ User sentence:
             session_id: int | None = None,
             extra: dict | None = None,
     ) -> None:
-        """FR16: Log learning event to Supabase."""
+        """FR16: Queue a learning event for the background writer."""
+        # Cap the learner's own text, not the [TOPIC]/[STYLE] blocks the UI
+        # puts in front of it (those alone can exceed 200 chars).
         payload: dict = {
-            "last_input": user_input[:200],
+            "last_input": self._learner_text(user_input).strip()[:200],
             "last_reply": reply_text[:400],
         }
         if session_id is not None:
@@ -409,11 +1014,44 @@ User sentence:
         if extra:
             payload.update(extra)
 
+        event = {"kind": "tutor_interaction", "payload": payload, "session_id": session_id}
         try:
-            add_learning_event(
-                kind="tutor_interaction",
-                payload=payload,
-                session_id=session_id,
-            )
+            self._log_q.put_nowait(event)
+        except queue.Full:
+            print("⚠️  Learning event queue full, dropping event")
+        if self._ctx_events is not None:
+            # Same shape/order as get_recent_learning_events (newest first)
+            self._ctx_events = [event] + self._ctx_events[:4]
+
+    def _log_worker(self) -> None:
+        """Drain the event queue, inserting up to LOG_BATCH_SIZE events per request."""
+        while True:
+            batch = [self._log_q.get()]
+            deadline = time.monotonic() + self.LOG_FLUSH_INTERVAL
+            while len(batch) < self.LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._log_q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_events(batch)
+
+    def _flush_log_queue(self) -> None:
+        """Write whatever is still queued (called at interpreter exit)."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._log_q.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write_events(batch)
+
+    @staticmethod
+    def _write_events(batch: list[dict]) -> None:
+        try:
+            add_learning_events_bulk(batch)
         except Exception:
             pass  # Don't crash if logging fails
\ No newline at end of file
@@ -3,9 +3,8 @@
 import sys
 
 # ✅ Load .env BEFORE importing anything that reads env vars
-from dotenv import load_dotenv, find_dotenv
-path = find_dotenv(usecwd=True) or find_dotenv()
-load_dotenv(path, override=True)
+from app._env import ensure_env_loaded
+ensure_env_loaded()
 
 from PySide6 import QtWidgets
 from app.ui.main_window import MainWindow
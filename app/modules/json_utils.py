@@ -0,0 +1,23 @@
+# app/modules/json_utils.py
+import sys
+
+# Longer strings are sentences / passages; those are rarely repeated
+INTERN_MAX_LEN = 32
+
+
+def intern_strings(obj):
+    """
+    Return a copy of parsed JSON with short strings (keys, level codes,
+    option labels, ids) interned, so repeats across files share one object.
+    """
+    if isinstance(obj, dict):
+        return {_intern(k): intern_strings(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [intern_strings(v) for v in obj]
+    return _intern(obj)
+
+
+def _intern(value):
+    if type(value) is str and len(value) < INTERN_MAX_LEN:
+        return sys.intern(value)
+    return value
@@ -1,17 +1,38 @@
 import json
+import os
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict
 
+from app.modules.json_utils import intern_strings
+
 BASE_DIR = Path(__file__).resolve().parents[1]   # -> app/
 READING_DIR = BASE_DIR / "reading"              # -> app/reading
 
+
+@lru_cache(maxsize=8)
+def _scan_level(level_dir: str, mtime_ns: int) -> tuple:
+    # mtime_ns is only part of the cache key: adding/removing a set changes it
+    with os.scandir(level_dir) as it:
+        return tuple(sorted(Path(e.path) for e in it if e.name.endswith(".json") and e.is_file()))
+
+
 def list_reading_sets(level: str) -> List[Path]:
     level_dir = READING_DIR / level
-    if not level_dir.exists():
+    try:
+        mtime_ns = level_dir.stat().st_mtime_ns
+    except FileNotFoundError:
         return []
-    return sorted(level_dir.glob("*.json"))      # ✅ bu satır şart
+    return list(_scan_level(str(level_dir), mtime_ns))
+
+
+@lru_cache(maxsize=32)
+def _load_json(path: str, mtime_ns: int) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return intern_strings(json.load(f))
+
 
 def load_reading_set(path: str | Path) -> Dict:
+    """Parsed reading set, cached until the file changes. Treat it as read-only."""
     path = Path(path)
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
\ No newline at end of file
+    return _load_json(str(path), path.stat().st_mtime_ns)
@@ -2,38 +2,89 @@
 from __future__ import annotations
 
 import json
+import sqlite3
+import threading
 from pathlib import Path
 from typing import Dict, List
 
+try:
+    import orjson  # optional, much faster JSON encode/decode
+except ImportError:
+    orjson = None
+
 from app.services.db_supabase import current_user_id
 
 DATA_DIR = (Path(__file__).resolve().parents[1] / "data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
-DATA_FILE = DATA_DIR / "vocab_store.json"
-
-# { user_id: { word: { "definition": str, "examples": [str] } } }
-_vocab_cache: Dict[str, Dict[str, dict]] = {}
-
-
-def _load() -> None:
-    global _vocab_cache
-    if DATA_FILE.exists():
+DB_FILE = DATA_DIR / "vocab.db"
+# Pre-SQLite store, imported once when vocab.db is created
+LEGACY_FILE = DATA_DIR / "vocab_store.json"
+
+SCHEMA_VERSION = 1
+
+# One row per (user, word); examples are stored as a JSON array
+_conn = sqlite3.connect(DB_FILE, isolation_level=None, check_same_thread=False)
+_lock = threading.Lock()
+
+# user_id -> known words; built on first use, dropped when the user adds a word
+_known_cache: Dict[str, frozenset[str]] = {}
+
+
+def _init_db() -> None:
+    with _lock:
+        _conn.execute("PRAGMA journal_mode=WAL")
+        if _conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS vocab ("
+            " user_id TEXT NOT NULL,"
+            " word TEXT NOT NULL,"
+            " definition TEXT NOT NULL DEFAULT '',"
+            " examples TEXT NOT NULL DEFAULT '[]',"
+            " PRIMARY KEY (user_id, word))"
+        )
+        _conn.execute("BEGIN")
         try:
-            _vocab_cache = json.loads(DATA_FILE.read_text(encoding="utf-8"))
+            _import_legacy_file()
+            _conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            _conn.execute("COMMIT")
         except Exception:
-            _vocab_cache = {}
-    else:
-        _vocab_cache = {}
+            _conn.execute("ROLLBACK")
+            raise
+
+
+def _import_legacy_file() -> None:
+    """Copy { user_id: { word: {definition, examples} } } from the old JSON file."""
+    if not LEGACY_FILE.exists():
+        return
+    try:
+        data = _loads(LEGACY_FILE.read_bytes())
+    except Exception:
+        return
+    rows = [
+        (user_id, word, info.get("definition", ""), _dumps_examples(info.get("examples", [])))
+        for user_id, words in data.items()
+        for word, info in words.items()
+    ]
+    _conn.executemany(
+        "INSERT OR IGNORE INTO vocab (user_id, word, definition, examples) VALUES (?, ?, ?, ?)",
+        rows,
+    )
 
 
-def _save() -> None:
-    DATA_FILE.write_text(
-        json.dumps(_vocab_cache, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+def _dumps_examples(examples: List[str]) -> str:
+    if orjson is not None:
+        return orjson.dumps(examples).decode("utf-8")
+    return json.dumps(examples, ensure_ascii=False)
 
 
-_load()
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_init_db()
 
 
 def _uid_or_default() -> str:
@@ -45,11 +96,27 @@ def _uid_or_default() -> str:
 def get_user_vocab(user_id: str | None = None) -> Dict[str, dict]:
     if user_id is None:
         user_id = _uid_or_default()
-    return _vocab_cache.get(user_id, {})
+    with _lock:
+        rows = _conn.execute(
+            "SELECT word, definition, examples FROM vocab WHERE user_id = ? ORDER BY rowid",
+            (user_id,),
+        ).fetchall()
+    return {
+        word: {"definition": definition, "examples": _loads(examples)}
+        for word, definition, examples in rows
+    }
 
 
-def get_known_words_set(user_id: str | None = None) -> set[str]:
-    return set(get_user_vocab(user_id).keys())
+def get_known_words_set(user_id: str | None = None) -> frozenset[str]:
+    """The user's saved words (lowercase), cached until the next add_word."""
+    if user_id is None:
+        user_id = _uid_or_default()
+    with _lock:
+        known = _known_cache.get(user_id)
+        if known is None:
+            rows = _conn.execute("SELECT word FROM vocab WHERE user_id = ?", (user_id,)).fetchall()
+            known = _known_cache[user_id] = frozenset(word for (word,) in rows)
+    return known
 
 
 def add_word(
@@ -62,10 +129,12 @@ def add_word(
         user_id = _uid_or_default()
     word = word.lower()
     examples = examples or []
-    if user_id not in _vocab_cache:
-        _vocab_cache[user_id] = {}
-    _vocab_cache[user_id][word] = {
-        "definition": definition,
-        "examples": examples,
-    }
-    _save()
+    # Upsert keeps the word's original position (rowid) when it is re-saved
+    with _lock:
+        _conn.execute(
+            "INSERT INTO vocab (user_id, word, definition, examples) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (user_id, word) DO UPDATE SET "
+            "definition = excluded.definition, examples = excluded.examples",
+            (user_id, word, definition, _dumps_examples(examples)),
+        )
+        _known_cache.pop(user_id, None)
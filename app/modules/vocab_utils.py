@@ -2,23 +2,29 @@
 from __future__ import annotations
 
 import re
-from collections import Counter
+from functools import lru_cache
 from typing import Iterable, Set
 
 # Very small demo list - extend if you like
-COMMON_WORDS: Set[str] = {
+COMMON_WORDS: frozenset[str] = frozenset({
     "the", "be", "to", "of", "and", "a", "in", "that", "have", "i", "it",
     "for", "not", "on", "with", "he", "as", "you", "do", "at", "this",
     "but", "his", "by", "from", "they", "we", "say", "her", "she", "or",
     "an", "will", "my", "one", "all", "would", "there", "their", "is", "are"
-}
+})
 
 WORD_RE = re.compile(r"[A-Za-z\-']+")
 
 
 def tokenize(text: str) -> list[str]:
     """Simple word tokenizer."""
-    return [w for w in WORD_RE.findall(text)]
+    return WORD_RE.findall(text)
+
+
+@lru_cache(maxsize=8)
+def _long_word_re(min_length: int) -> re.Pattern:
+    """Whole WORD_RE tokens made only of letters, at least min_length long."""
+    return re.compile(rf"(?<![A-Za-z\-'])[A-Za-z]{{{min_length},}}(?![A-Za-z\-'])")
 
 
 def find_new_vocabulary(
@@ -33,19 +39,16 @@ def find_new_vocabulary(
     - length >= min_length
     - not in COMMON_WORDS
     - not in known_words (user's word list)
+
+    A set/frozenset of known words (e.g. from get_known_words_set) is used
+    as-is and must be lowercase; other iterables are lowercased first.
     """
-    known = {w.lower() for w in (known_words or [])}
-    tokens = [t.lower() for t in tokenize(text)]
-    counts = Counter(tokens)
-
-    new_words: Set[str] = set()
-    for word, _freq in counts.items():
-        if (
-            len(word) >= min_length
-            and word.isalpha()
-            and word not in COMMON_WORDS
-            and word not in known
-        ):
-            new_words.add(word)
-
-    return new_words
+    if isinstance(known_words, (set, frozenset)):
+        known = known_words
+    else:
+        known = {w.lower() for w in (known_words or [])}
+
+    tokens = set(map(str.lower, _long_word_re(min_length).findall(text)))
+    tokens -= COMMON_WORDS
+    tokens -= known
+    return tokens
@@ -1,58 +1,262 @@
 # app/services/db_supabase.py
 
-import os, json, pathlib
+import os, json, pathlib, atexit, queue, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Dict, Any, List
 
 from supabase import create_client, Client
-from dotenv import load_dotenv, find_dotenv
 
-# Load .env from project or CWD
-load_dotenv(find_dotenv(usecwd=True) or find_dotenv())
+from app._env import ensure_env_loaded
+from app.services.retry import retry_db_operation
+
+try:
+    import orjson  # optional, much faster JSON encode/decode
+except ImportError:
+    orjson = None
 
 # -------------------- Supabase Init --------------------
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
+# Created on first use, so importing this module never touches the network
+_sb: Optional[Client] = None
+_client_lock = threading.Lock()
+
+
+def _client_options():
+    """
+    One long-lived httpx client for PostgREST, so back-to-back writes reuse
+    the connection; HTTP/2 (when h2 is installed) multiplexes them on it.
+    Returns None on supabase versions without the httpx_client option.
+    """
+    try:
+        import httpx
+        from supabase import ClientOptions
+    except ImportError:
+        return None
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    # retries= only re-attempts failed connects, never a sent request
+    transport = httpx.HTTPTransport(
+        http2=http2,
+        retries=3,
+        limits=httpx.Limits(max_connections=60, max_keepalive_connections=40, keepalive_expiry=60),
+    )
+    http = httpx.Client(transport=transport, timeout=httpx.Timeout(30.0, connect=5.0))
+    try:
+        options = ClientOptions(httpx_client=http)
+    except TypeError:
+        http.close()
+        return None
+    # Not closed at exit: atexit runs last-registered first, and this client is
+    # created after the writers register their exit-time flushes
+    return options
 
-if not SUPABASE_URL or not SUPABASE_ANON_KEY:
-    raise RuntimeError("Missing SUPABASE_URL / SUPABASE_ANON_KEY in .env")
 
-sb: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+def _execute(query, idempotent: bool = True):
+    """query.execute() with retries on transient network errors."""
+    return retry_db_operation(query.execute, idempotent=idempotent)
 
 
 def get_client() -> Client:
-    """Small helper so other modules can reuse the Supabase client."""
-    return sb
+    """The shared Supabase client, created on first call."""
+    global _sb
+    if _sb is None:
+        with _client_lock:
+            if _sb is None:
+                ensure_env_loaded()
+                url = os.getenv("SUPABASE_URL")
+                key = os.getenv("SUPABASE_ANON_KEY")
+                if not url or not key:
+                    raise RuntimeError("Missing SUPABASE_URL / SUPABASE_ANON_KEY in .env")
+                options = _client_options()
+                _sb = create_client(url, key, options=options) if options else create_client(url, key)
+                # Keep SESSION_FILE in step with supabase-py's own token refreshes
+                _sb.auth.on_auth_state_change(_on_auth_state_change)
+    return _sb
+
+
+def __getattr__(name: str):
+    # Keeps `from app.services.db_supabase import sb` working
+    if name == "sb":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# -------------------- Batched Writes --------------------
+class _WriteBatcher:
+    """
+    Collects rows for one table and inserts them in a single request.
+    A batch goes out FLUSH_INTERVAL after its first row, or as soon as
+    MAX_BATCH rows are waiting. Rows in a batch must share the same keys.
+    """
+
+    FLUSH_INTERVAL = 0.05
+    MAX_BATCH = 10
+
+    def __init__(self, table: str):
+        self._table = table
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._worker = threading.Thread(target=self._run, daemon=True, name=f"{table}-writer")
+        self._worker.start()
+        atexit.register(self.close)
+
+    def submit(self, row: Dict[str, Any]) -> Future:
+        """Queue a row; the future resolves to its inserted id (or None)."""
+        fut: Future = Future()
+        self._queue.put((row, fut))
+        return fut
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush what is queued and stop the worker."""
+        self._queue.put(None)
+        self._worker.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            stop = False
+            while len(batch) < self.MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: list) -> None:
+        try:
+            res = _execute(get_client().table(self._table).insert([row for row, _ in batch]), idempotent=False)
+        except Exception as e:
+            print(f"⚠️ Batched insert into {self._table} failed: {e}")
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        # PostgREST returns the inserted rows in request order
+        data = res.data or []
+        for i, (_, fut) in enumerate(batch):
+            fut.set_result(data[i]["id"] if i < len(data) else None)
+
+
+_message_writer = _WriteBatcher("chat_messages")
+
+# Runs independent requests side by side (see fetch_home_bundle)
+_io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sb-io")
 
 
 # -------------------- Session Persistence --------------------
 SESSION_FILE = pathlib.Path.home() / ".ai_tutor_supabase_session.json"
 
+# Signed-in user, set on sign-in / session restore and cleared on sign-out,
+# so DB helpers don't go through auth.get_session() on every call.
+_cached_uid: Optional[str] = None
+_cached_email: Optional[str] = None
+
+
+def _remember_user(user) -> None:
+    global _cached_uid, _cached_email
+    _cached_uid = getattr(user, "id", None)
+    _cached_email = getattr(user, "email", None)
+
+
+# Token writes are debounced: a sign-in and the auth events it triggers
+# (or a burst of refreshes) end up as a single write of the latest tokens.
+SESSION_WRITE_DELAY = 0.5
+_session_timer: Optional[threading.Timer] = None
+_session_pending: Optional[tuple] = None
+_session_lock = threading.Lock()
+
+
+def _write_session_file(access_token: str, refresh_token: str) -> None:
+    data = {"access_token": access_token, "refresh_token": refresh_token}
+    if orjson is not None:
+        raw = orjson.dumps(data)
+    else:
+        raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    # Write then rename, so a crash never leaves a half-written file
+    tmp = SESSION_FILE.with_suffix(".tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, SESSION_FILE)
+
+
+def _schedule_session_write(access_token: str, refresh_token: str) -> None:
+    global _session_timer, _session_pending
+    with _session_lock:
+        if _session_timer is not None:
+            _session_timer.cancel()
+        _session_pending = (access_token, refresh_token)
+        _session_timer = threading.Timer(SESSION_WRITE_DELAY, flush_session_write)
+        _session_timer.daemon = True
+        _session_timer.start()
+
+
+def _cancel_session_write() -> None:
+    global _session_timer, _session_pending
+    with _session_lock:
+        if _session_timer is not None:
+            _session_timer.cancel()
+        _session_timer = _session_pending = None
+
+
+def flush_session_write() -> None:
+    """Write pending tokens now (also runs at exit)."""
+    global _session_timer, _session_pending
+    with _session_lock:
+        pending, _session_pending, _session_timer = _session_pending, None, None
+    if pending:
+        try:
+            _write_session_file(*pending)
+        except OSError as e:
+            print(f"⚠️ Could not save session: {e}")
+
+
+atexit.register(flush_session_write)
+
+
+def _on_auth_state_change(event: str, session) -> None:
+    if event == "SIGNED_OUT" or session is None:
+        _cancel_session_write()
+    elif event in ("SIGNED_IN", "TOKEN_REFRESHED"):
+        _schedule_session_write(session.access_token, session.refresh_token)
+
 
 def save_session(access_token: str, refresh_token: str):
-    SESSION_FILE.write_text(json.dumps({
-        "access_token": access_token,
-        "refresh_token": refresh_token
-    }, indent=2))
-    sb.postgrest.auth(access_token)
+    _schedule_session_write(access_token, refresh_token)
+    get_client().postgrest.auth(access_token)
 
 
 def load_session_if_any() -> bool:
     if not SESSION_FILE.exists():
         return False
     try:
-        data = json.loads(SESSION_FILE.read_text())
+        raw = SESSION_FILE.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         access = data.get("access_token")
         refresh = data.get("refresh_token")
         if not access or not refresh:
             return False
 
-        sb.postgrest.auth(access)
-        sb.auth.set_session(access, refresh)
-        sess = sb.auth.get_session()
+        # set_session refreshes an expired access token itself and returns
+        # the resulting session, so no separate get_session() is needed
+        sb = get_client()
+        sess = sb.auth.set_session(access, refresh).session
         if not sess or not sess.user:
             return False
 
         sb.postgrest.auth(sess.access_token)
+        _remember_user(sess.user)
         return True
     except Exception:
         return False
@@ -60,23 +264,28 @@ def load_session_if_any() -> bool:
 
 # -------------------- Auth --------------------
 def sign_up(email: str, password: str) -> Dict[str, Any]:
-    res = sb.auth.sign_up({"email": email, "password": password})
+    res = get_client().auth.sign_up({"email": email, "password": password})
     if res.user is None:
         raise RuntimeError("Sign-up failed")
     return {"user_id": res.user.id, "email": res.user.email}
 
 
 def sign_in(email: str, password: str) -> Dict[str, Any]:
-    res = sb.auth.sign_in_with_password({"email": email, "password": password})
+    res = get_client().auth.sign_in_with_password({"email": email, "password": password})
     if not res.session or not res.user:
         raise RuntimeError("Login failed")
     save_session(res.session.access_token, res.session.refresh_token)
+    _remember_user(res.user)
     return {"user_id": res.user.id, "email": res.user.email}
 
 
 def sign_out():
+    _remember_user(None)
+    _forget_profile()
+    _default_session.clear()
+    _cancel_session_write()
     try:
-        sb.auth.sign_out()
+        get_client().auth.sign_out()
     except Exception:
         pass
     try:
@@ -86,37 +295,54 @@ def sign_out():
         pass
 
 
+def _user_from_session() -> None:
+    """Fill the cache from a session that was set up elsewhere (e.g. by sign_up)."""
+    if _cached_uid is None and _sb is not None:
+        sess = _sb.auth.get_session()
+        if sess and getattr(sess, "user", None):
+            _remember_user(sess.user)
+
+
 def current_user_id() -> Optional[str]:
-    sess = sb.auth.get_session()
-    return getattr(getattr(sess, "user", None), "id", None)
+    if _cached_uid is None:
+        _user_from_session()
+    return _cached_uid
 
 
 def current_user_email() -> Optional[str]:
     """Return the logged-in user's email from Supabase auth (not from profiles)."""
-    sess = sb.auth.get_session()
-    if not sess or not getattr(sess, "user", None):
-        return None
-    return getattr(sess.user, "email", None)
+    if _cached_email is None:
+        _user_from_session()
+    return _cached_email
 
 
 # -------------------- Chat Sessions --------------------
+# uid -> latest session id, so repeat calls skip the SELECT (and maybe INSERT)
+_default_session: Dict[str, int] = {}
+
+
 def get_or_create_default_session() -> int:
     uid = current_user_id()
     if not uid:
         raise RuntimeError("Not authenticated")
+    if uid in _default_session:
+        return _default_session[uid]
+    _default_session[uid] = sid = _fetch_or_create_default_session(uid)
+    return sid
+
 
-    res = (
-        sb.table("chat_sessions")
+def _fetch_or_create_default_session(uid: str) -> int:
+    res = _execute(
+        get_client().table("chat_sessions")
         .select("id")
         .eq("user_id", uid)
         .order("created_at", desc=True)
         .limit(1)
-        .execute()
     )
     if res.data:
         return res.data[0]["id"]
 
-    ins = sb.table("chat_sessions").insert({
+    ins = get_client().table("chat_sessions").insert({
         "user_id": uid,
         "title": "My Chat"
     }).execute()
@@ -127,26 +353,101 @@ def add_message(session_id: int, role: str, content: str, meta: dict | None = No
     uid = current_user_id()
     if not uid:
         raise RuntimeError("Not authenticated")
-    ins = sb.table("chat_messages").insert({
+    ins = _execute(get_client().table("chat_messages").insert({
         "session_id": session_id,
         "user_id": uid,
         "role": role,
         "content": content,
         "meta": meta or {}
-    }).execute()
+    }), idempotent=False)
     return ins.data[0]["id"]
 
 
+def _message_row(session_id: int, role: str, content: str, meta: dict | None) -> Dict[str, Any]:
+    uid = current_user_id()
+    if not uid:
+        raise RuntimeError("Not authenticated")
+    return {
+        "session_id": session_id,
+        "user_id": uid,
+        "role": role,
+        "content": content,
+        "meta": meta or {}
+    }
+
+
+# Messages held back by queue_message until the rest of the chat turn is ready
+_pending_messages: List[Dict[str, Any]] = []
+_pending_lock = threading.Lock()
+
+
+def queue_message(session_id: int, role: str, content: str, meta: dict | None = None) -> None:
+    """
+    Hold a message until the next add_message_async / flush_messages, so a
+    turn's user and assistant messages are saved with one insert.
+    """
+    row = _message_row(session_id, role, content, meta)
+    with _pending_lock:
+        _pending_messages.append(row)
+
+
+def flush_messages() -> List[Future]:
+    """Send held messages to the batched writer; one Future per message."""
+    with _pending_lock:
+        rows = _pending_messages[:]
+        _pending_messages.clear()
+    return [_message_writer.submit(row) for row in rows]
+
+
+# Registered after the writers, so it runs before they shut down
+atexit.register(flush_messages)
+
+
+def add_message_async(session_id: int, role: str, content: str, meta: dict | None = None) -> Future:
+    """
+    Like add_message, but batched with other writes; returns a Future
+    that resolves to the new message id. Use add_message when the id is
+    needed right away. Held messages (queue_message) are sent first, and
+    the Future fails if any of them could not be saved either.
+    """
+    row = _message_row(session_id, role, content, meta)
+    held = flush_messages()
+    fut = _message_writer.submit(row)
+    if not held:
+        return fut
+
+    turn: Future = Future()
+
+    def _resolve(f: Future) -> None:
+        # One writer thread flushes in order, so the held rows are done by now
+        errors = [h.exception() for h in held] + [f.exception()]
+        error = next((e for e in errors if e is not None), None)
+        if error is not None:
+            turn.set_exception(error)
+        else:
+            turn.set_result(f.result())
+
+    fut.add_done_callback(_resolve)
+    return turn
+
+
 def list_messages(session_id: int, limit: int = 50) -> List[Dict[str, Any]]:
-    res = (
-        sb.table("chat_messages")
-        .select("*")
+    res = _execute(
+        get_client().table("chat_messages")
+        .select("id,role,content,created_at")
         .eq("session_id", session_id)
         .order("created_at", desc=True)
+        .order("id", desc=True)  # a turn's messages share one insert (and created_at)
         .limit(limit)
-        .execute()
     )
-    return list(reversed(res.data))  # oldest → newest
+    msgs = res.data or []
+    msgs.reverse()  # oldest → newest, in place: no second copy of the history
+    return msgs
+
+
+def prefetch_messages(session_ids: List[int], limit: int = 50) -> Dict[int, Future]:
+    """Start list_messages for each session in the background; session_id -> Future."""
+    return {sid: _io_pool.submit(list_messages, sid, limit) for sid in session_ids}
 
 
 def list_user_sessions(limit: int = 50) -> List[Dict[str, Any]]:
@@ -154,13 +455,12 @@ def list_user_sessions(limit: int = 50) -> List[Dict[str, Any]]:
     if not uid:
         raise RuntimeError("Not authenticated")
 
-    res = (
-        sb.table("chat_sessions")
+    res = _execute(
+        get_client().table("chat_sessions")
         .select("id,title,created_at")
         .eq("user_id", uid)
         .order("created_at", desc=True)
         .limit(limit)
-        .execute()
     )
     return res.data or []
 
@@ -169,10 +469,12 @@ def create_session(title: str = "New Chat") -> Dict[str, Any]:
     uid = current_user_id()
     if not uid:
         raise RuntimeError("Not authenticated")
-    ins = sb.table("chat_sessions").insert({
+    ins = get_client().table("chat_sessions").insert({
         "user_id": uid,
         "title": title
     }).execute()
+    # The new session is now the latest one
+    _default_session.pop(uid, None)
     return ins.data[0]
 
 
@@ -180,7 +482,7 @@ def rename_session(session_id: int, new_title: str) -> None:
     uid = current_user_id()
     if not uid:
         raise RuntimeError("Not authenticated")
-    sb.table("chat_sessions") \
+    get_client().table("chat_sessions") \
         .update({"title": new_title}) \
         .eq("id", session_id) \
         .eq("user_id", uid) \
@@ -191,20 +493,52 @@ def delete_session(session_id: int) -> None:
     uid = current_user_id()
     if not uid:
         raise RuntimeError("Not authenticated")
-    sb.table("chat_sessions") \
+    get_client().table("chat_sessions") \
         .delete() \
         .eq("id", session_id) \
         .eq("user_id", uid) \
         .execute()
+    if _default_session.get(uid) == session_id:
+        del _default_session[uid]
 
 
 # -------------------- User Profile (Placement Test) --------------------
+# Profile and last placement rarely change but are read on every UI refresh.
+# uid -> (fetched_at, value); writes below drop the user's entries.
+PROFILE_CACHE_TTL = 60.0
+_profile_cache: Dict[str, tuple] = {}
+_placement_cache: Dict[str, tuple] = {}
+
+
+def _cached(cache: Dict[str, tuple], uid: str, fetch):
+    now = time.monotonic()
+    hit = cache.get(uid)
+    if hit and now - hit[0] < PROFILE_CACHE_TTL:
+        return hit[1]
+    value = fetch()
+    cache[uid] = (now, value)
+    return value
+
+
+def _forget_profile(uid: Optional[str] = None) -> None:
+    if uid is None:
+        _profile_cache.clear()
+        _placement_cache.clear()
+    else:
+        _profile_cache.pop(uid, None)
+        _placement_cache.pop(uid, None)
+
+
 def get_current_profile() -> Optional[Dict[str, Any]]:
     uid = current_user_id()
     if not uid:
         return None
-    res = sb.table("profiles").select("*").eq("id", uid).limit(1).execute()
-    return res.data[0] if res.data else None
+
+    def fetch():
+        res = _execute(get_client().table("profiles").select("*").eq("id", uid).limit(1))
+        return res.data[0] if res.data else None
+
+    return _cached(_profile_cache, uid, fetch)
 
 
 def upsert_cefr_level(level: str) -> Dict[str, Any]:
@@ -216,7 +550,8 @@ def upsert_cefr_level(level: str) -> Dict[str, Any]:
         raise ValueError(f"Invalid CEFR level: {level}")
 
     row = {"id": uid, "cefr_level": level}
-    res = sb.table("profiles").upsert(row, on_conflict="id").execute()
+    res = get_client().table("profiles").upsert(row, on_conflict="id").execute()
+    _forget_profile(uid)
     return res.data[0] if res.data else row
 
 
@@ -231,7 +566,12 @@ def update_profile_level(level: str) -> None:
 
     # Use upsert to handle both insert and update cases
     row = {"id": uid, "cefr_level": level}
-    sb.table("profiles").upsert(row, on_conflict="id").execute()
+    get_client().table("profiles").upsert(row, on_conflict="id").execute()
+    _forget_profile(uid)
+
+
+# PostgREST: the function does not exist (migration 0002 not applied yet)
+_RPC_MISSING_CODES = {"PGRST202", "404"}
 
 
 def save_placement_result(
@@ -246,6 +586,28 @@ def save_placement_result(
     if not uid:
         raise RuntimeError("Not authenticated")
 
+    if estimated_level not in ("A1", "A2", "B1", "B2", "C1", "C2"):
+        raise ValueError(f"Invalid CEFR level: {estimated_level}")
+
+    # One round-trip and one transaction (migrations/0002_save_placement_and_level.sql)
+    try:
+        res = get_client().rpc("save_placement_and_level", {
+            "est": estimated_level,
+            "tc": total_correct,
+            "tq": total_questions,
+            "pl": per_level,
+            "ans": answers or {},
+        }).execute()
+    except Exception as e:
+        # Any other failure may come after the server committed (e.g. a read
+        # timeout); two more writes would then duplicate the result
+        if str(getattr(e, "code", "")) not in _RPC_MISSING_CODES:
+            raise
+        print(f"⚠️ save_placement_and_level is not installed, using two writes: {e}")
+    else:
+        _forget_profile(uid)
+        return res.data[0] if isinstance(res.data, list) else res.data
+
     row = {
         "user_id": uid,
         "estimated_level": estimated_level,
@@ -255,9 +617,10 @@ def save_placement_result(
         "answers": answers or {},
     }
 
-    res = sb.table("placement_tests").insert(row).execute()
+    res = get_client().table("placement_tests").insert(row).execute()
     saved = res.data[0]
 
+    # Only once the result is stored; also drops the cached placement result
     upsert_cefr_level(estimated_level)
     return saved
 
@@ -267,15 +630,17 @@ def get_last_placement_result() -> Optional[Dict[str, Any]]:
     if not uid:
         return None
 
-    res = (
-        sb.table("placement_tests")
-        .select("*")
-        .eq("user_id", uid)
-        .order("created_at", desc=True)
-        .limit(1)
-        .execute()
-    )
-    return res.data[0] if res.data else None
+    def fetch():
+        res = _execute(
+            get_client().table("placement_tests")
+            .select("id,estimated_level,total_correct,total_questions,per_level,created_at")
+            .eq("user_id", uid)
+            .order("created_at", desc=True)
+            .limit(1)
+        )
+        return res.data[0] if res.data else None
+
+    return _cached(_placement_cache, uid, fetch)
 
 
 # -------------------- Learning Memory (FR16 & FR17) --------------------
@@ -284,6 +649,7 @@ def add_learning_event(
         payload: Dict[str, Any],
         session_id: Optional[int] = None,
 ) -> Optional[int]:
+    """Insert one event. The tutor engine batches its own events (add_learning_events_bulk)."""
     uid = current_user_id()
     if not uid:
         return None
@@ -297,30 +663,80 @@ def add_learning_event(
         row["session_id"] = session_id
 
     try:
-        res = sb.table("learning_events").insert(row).execute()
+        res = get_client().table("learning_events").insert(row).execute()
         return res.data[0]["id"] if res.data else None
     except Exception:
         return None
 
 
+def add_learning_events_bulk(events: List[Dict[str, Any]]) -> int:
+    """
+    Insert several learning events in one request.
+    Each item: {"kind": str, "payload": dict, "session_id": int | None}.
+    Returns the number of inserted rows.
+    """
+    uid = current_user_id()
+    if not uid or not events:
+        return 0
+
+    # Bulk inserts need the same keys on every row
+    rows = [
+        {
+            "user_id": uid,
+            "kind": ev["kind"],
+            "payload": ev["payload"],
+            "session_id": ev.get("session_id"),
+        }
+        for ev in events
+    ]
+    try:
+        res = get_client().table("learning_events").insert(rows).execute()
+        return len(res.data or [])
+    except Exception:
+        return 0
+
+
 def get_recent_learning_events(limit: int = 5) -> List[Dict[str, Any]]:
     uid = current_user_id()
     if not uid:
         return []
     try:
-        res = (
-            sb.table("learning_events")
+        res = _execute(
+            get_client().table("learning_events")
             .select("kind,payload,created_at,session_id")
             .eq("user_id", uid)
             .order("created_at", desc=True)
             .limit(limit)
-            .execute()
         )
         return res.data or []
     except Exception:
         return []
 
 
+# -------------------- Home Screen --------------------
+
+
+def fetch_home_bundle(session_limit: int = 50) -> Dict[str, Any]:
+    """
+    Run the start-up reads in parallel, so they cost one round-trip instead of two.
+    Keys: profile, sessions. A failed read gives None / [] instead of raising.
+    The profile also lands in its TTL cache.
+    """
+    jobs = {
+        "profile": (get_current_profile, (), None),
+        "sessions": (list_user_sessions, (session_limit,), []),
+    }
+    futures = {key: _io_pool.submit(fn, *args) for key, (fn, args, _) in jobs.items()}
+    bundle: Dict[str, Any] = {}
+    for key, fut in futures.items():
+        try:
+            bundle[key] = fut.result()
+        except Exception as e:
+            print(f"⚠️ Home screen read '{key}' failed: {e}")
+            bundle[key] = jobs[key][2]
+    return bundle
+
+
 # -------------------- ADMIN – UC17 / UC18 helpers --------------------
 
 def get_flagged_learning_events(limit: int = 50) -> List[Dict[str, Any]]:
@@ -333,7 +749,7 @@ def get_flagged_learning_events(limit: int = 50) -> List[Dict[str, Any]]:
     """
     try:
         res = (
-            sb.table("learning_events")
+            get_client().table("learning_events")
             .select("*")
             .in_("kind", ["flagged_feedback", "user_report"])
             .order("created_at", desc=True)
@@ -355,7 +771,7 @@ def resolve_flagged_event(event_id: Any, action: str) -> bool:
 
     try:
         (
-            sb.table("learning_events")
+            get_client().table("learning_events")
             .update({"status": action})
             .eq("id", event_id)
             .execute()
@@ -375,7 +791,7 @@ def list_lessons() -> List[Dict[str, Any]]:
     """
     try:
         res = (
-            sb.table("lessons")
+            get_client().table("lessons")
             .select("*")
             .order("updated_at", desc=True)
             .execute()
@@ -392,7 +808,7 @@ def upsert_lesson(lesson: Dict[str, Any]) -> bool:
     """
     try:
         (
-            sb.table("lessons")
+            get_client().table("lessons")
             .upsert(lesson)
             .execute()
         )
@@ -404,7 +820,7 @@ def upsert_lesson(lesson: Dict[str, Any]) -> bool:
 def delete_lesson(lesson_id: Any) -> bool:
     try:
         (
-            sb.table("lessons")
+            get_client().table("lessons")
             .delete()
             .eq("id", lesson_id)
             .execute()
@@ -0,0 +1,20 @@
+-- app/services/migrations/0001_indexes.sql
+-- Indexes for the "filter by owner, newest first" queries in db_supabase.py.
+-- Plain CREATE INDEX because migrations run inside a transaction; on a large
+-- live table run each statement by hand with CREATE INDEX CONCURRENTLY instead.
+
+-- list_user_sessions, get_or_create_default_session
+CREATE INDEX IF NOT EXISTS chat_sessions_user_created
+    ON public.chat_sessions (user_id, created_at DESC);
+
+-- list_messages
+CREATE INDEX IF NOT EXISTS chat_messages_session_created
+    ON public.chat_messages (session_id, created_at DESC);
+
+-- get_recent_learning_events
+CREATE INDEX IF NOT EXISTS learning_events_user_created
+    ON public.learning_events (user_id, created_at DESC);
+
+-- get_last_placement_result
+CREATE INDEX IF NOT EXISTS placement_tests_user_created
+    ON public.placement_tests (user_id, created_at DESC);
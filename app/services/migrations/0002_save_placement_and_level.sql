@@ -0,0 +1,36 @@
+-- app/services/migrations/0002_save_placement_and_level.sql
+-- Saves a placement result and the user's CEFR level in one transaction.
+-- Called by db_supabase.save_placement_result via rpc(); runs as the caller,
+-- so the usual RLS policies on placement_tests / profiles still apply.
+
+CREATE OR REPLACE FUNCTION public.save_placement_and_level(
+    est text,
+    tc int,
+    tq int,
+    pl jsonb,
+    ans jsonb
+)
+RETURNS public.placement_tests
+LANGUAGE plpgsql
+SECURITY INVOKER
+AS $$
+DECLARE
+    saved public.placement_tests;
+BEGIN
+    IF auth.uid() IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    INSERT INTO public.placement_tests
+        (user_id, estimated_level, total_correct, total_questions, per_level, answers)
+    VALUES
+        (auth.uid(), est, tc, tq, pl, ans)
+    RETURNING * INTO saved;
+
+    INSERT INTO public.profiles (id, cefr_level)
+    VALUES (auth.uid(), est)
+    ON CONFLICT (id) DO UPDATE SET cefr_level = excluded.cefr_level;
+
+    RETURN saved;
+END;
+$$;
@@ -0,0 +1,56 @@
+# app/services/retry.py
+import random
+import time
+from typing import Callable, TypeVar
+
+try:
+    import httpx
+except ImportError:  # supabase-py always brings httpx; keep the module importable anyway
+    httpx = None
+
+T = TypeVar("T")
+
+if httpx is not None:
+    # The request never reached the server: always safe to send again
+    _NOT_SENT = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+    # The server may have acted on it: only retry idempotent operations
+    _MAYBE_SENT = (httpx.ReadError, httpx.ReadTimeout, httpx.WriteError, httpx.RemoteProtocolError)
+else:
+    _NOT_SENT = (ConnectionRefusedError,)
+    _MAYBE_SENT = (ConnectionResetError, TimeoutError)
+
+# Gateway errors from the Supabase edge, surfaced by postgrest as APIError.code
+_GATEWAY_CODES = {"502", "503", "504"}
+
+
+def _is_transient(exc: Exception, idempotent: bool) -> bool:
+    if isinstance(exc, _NOT_SENT):
+        return True
+    if not idempotent:
+        return False
+    if isinstance(exc, _MAYBE_SENT):
+        return True
+    return str(getattr(exc, "code", "")) in _GATEWAY_CODES
+
+
+def retry_db_operation(
+    fn: Callable[[], T],
+    *,
+    max_retries: int = 3,
+    base: float = 0.2,
+    cap: float = 2.0,
+    idempotent: bool = True,
+) -> T:
+    """
+    Call fn(), retrying transient network failures with exponential backoff
+    and full jitter. Inserts should pass idempotent=False, so they are only
+    retried when the request provably never left the machine.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries or not _is_transient(e, idempotent):
+                raise
+            time.sleep(random.uniform(0, min(cap, base * 2 ** attempt)))
+    raise AssertionError("unreachable")
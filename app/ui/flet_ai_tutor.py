@@ -15,7 +15,10 @@ from __future__ import annotations
 
 import os
 import sys
+import time
 import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional
 
@@ -54,14 +57,15 @@ def MarOnly(left=None, top=None, right=None, bottom=None):
 # IMPORTS FROM YOUR PROJECT (optional)
 # ============================================
 try:
-    from app.engines.gemini_engine import GeminiEngine
+    from app.engines.gemini_engine import GeminiEngine, ReplyInterrupted
     from app.services.db_supabase import (
         sign_in, sign_up, sign_out, load_session_if_any,
         current_user_id, current_user_email,
         get_or_create_default_session, list_user_sessions,
         create_session, rename_session, delete_session,
-        add_message, list_messages,
-        get_current_profile, get_recent_learning_events,
+        add_message_async, queue_message, flush_messages, list_messages, prefetch_messages,
+        get_recent_learning_events,
+        fetch_home_bundle,
     )
     from app.modules.vocab_store import get_known_words_set, get_user_vocab
     IMPORTS_OK = True
@@ -79,7 +83,16 @@ class Message:
         self.sender = sender
         self.text = text
         self.timestamp = timestamp or datetime.now()
+        self.time_str = self.timestamp.strftime("%H:%M")
         self.id = msg_id
+        # Set by create_bubble, so a streamed reply can update its bubble in place
+        self.text_control: Optional[ft.Text] = None
+
+
+# Bubbles rendered when a chat opens; older ones are added while scrolling up
+MESSAGE_WINDOW = 30
+# Sessions whose saved-message bubbles are kept for reuse when switching back
+BUBBLE_CACHE_SESSIONS = 5
 
 
 # ============================================
@@ -105,6 +118,23 @@ PERSONA_STYLES = {
 }
 
 
+def _prompt_prefix(topic: str, persona: str) -> str:
+    prefix = ""
+    if persona != "Default":
+        prefix += f"[STYLE: {PERSONA_STYLES.get(persona, '')}]\n\n"
+    if topic != "Free Chat":
+        prefix += f"[TOPIC: {topic}]\n{TOPIC_PROMPTS.get(topic, '')}\n\n"
+    return prefix
+
+
+# Every dropdown combination, built once: a turn's prompt is prefix + text
+PROMPT_PREFIXES = {
+    (topic, persona): _prompt_prefix(topic, persona)
+    for topic in TOPIC_PROMPTS
+    for persona in PERSONA_STYLES
+}
+
+
 # ============================================
 # Small UI helpers (emoji icons)
 # ============================================
@@ -119,6 +149,15 @@ def emoji_badge(emoji: str, bg: str, size: int = 18, box: int = 36):
     )
 
 
+# Chat bubble styling. Flet controls can have only one parent, so each bubble
+# still gets its own controls, but these plain value objects are shared.
+_USER_AVATAR = ("🙂", "#168aad")
+_TUTOR_AVATAR = ("🤖", "#52b69a")
+_BUBBLE_PADDING = PadSymmetric(horizontal=14, vertical=12)
+_BUBBLE_SHADOW = ft.BoxShadow(blur_radius=8, color="#00000012", offset=ft.Offset(0, 2))
+_ROW_PADDING = PadSymmetric(horizontal=16, vertical=4)
+
+
 def emoji_button(emoji: str, tooltip: str, on_click, bg: str, fg: str = "white", box: int = 40):
     return ft.Container(
         content=ft.Text(emoji, size=18, color=fg),
@@ -156,8 +195,14 @@ def show_login_dialog(page: ft.Page, on_success):
 
     error_text = ft.Text("", color="red", size=12)
     is_signup = ft.Checkbox(label="Create new account", value=False)
+    progress = ft.ProgressRing(width=18, height=18, stroke_width=2, visible=False)
 
-    def do_login(e):
+    def set_busy(busy: bool):
+        continue_btn.disabled = busy
+        progress.visible = busy
+        page.update()
+
+    async def do_login(e):
         email = (email_field.value or "").strip()
         pwd = (password_field.value or "").strip()
 
@@ -166,18 +211,27 @@ def show_login_dialog(page: ft.Page, on_success):
             page.update()
             return
 
-        try:
+        def authenticate():
             if is_signup.value:
                 sign_up(email, pwd)
-                sign_in(email, pwd)
-            else:
-                sign_in(email, pwd)
+            sign_in(email, pwd)
 
-            page.close(dialog)
-            on_success()
+        # Network calls run in a worker thread so the dialog stays responsive
+        error_text.value = ""
+        set_busy(True)
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(None, authenticate)
         except Exception as ex:
             error_text.value = f"Error: {str(ex)[:120]}"
-            page.update()
+            set_busy(False)
+            return
+
+        page.close(dialog)
+        # on_success loads sessions/messages from Supabase too
+        await loop.run_in_executor(None, on_success)
+
+    continue_btn = ft.ElevatedButton("Continue", on_click=do_login, bgcolor="#168aad", color="white")
 
     dialog = ft.AlertDialog(
         modal=True,
@@ -193,7 +247,7 @@ def show_login_dialog(page: ft.Page, on_success):
                     email_field,
                     password_field,
                     is_signup,
-                    error_text,
+                    ft.Row([progress, error_text], spacing=8),
                 ],
                 spacing=12,
                 tight=True,
@@ -203,7 +257,7 @@ def show_login_dialog(page: ft.Page, on_success):
         ),
         actions=[
             ft.TextButton("Cancel", on_click=lambda e: page.close(dialog)),
-            ft.ElevatedButton("Continue", on_click=do_login, bgcolor="#168aad", color="white"),
+            continue_btn,
         ],
     )
 
@@ -218,16 +272,32 @@ class AITutorApp:
         self.page = page
 
         self.messages: list[Message] = []
+        # Kept in step with self.messages so show_summary doesn't rescan it
+        self._user_msg_count = 0
+        # Index of the oldest message that has a bubble in chat_list
+        self._rendered_from = 0
+        # session_id -> {msg_id: bubble}; saved messages never change, so
+        # their controls can be shown again instead of rebuilt
+        self._bubble_cache: OrderedDict = OrderedDict()
         self.session_id: Optional[int] = None
         self.sessions: list[dict] = []
+        # session_id -> Future of its messages, for the most recent sessions
+        self._msg_prefetch: dict = {}
+        # Supabase reads awaited from async handlers; kept apart from the default
+        # executor so they never queue behind a long engine call
+        self._db_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="db")
         self.engine = None
 
         self.current_topic = "Free Chat"
         self.current_persona = "Default"
+        self._prompt_prefix = ""
+        self._rebuild_prefix()
 
         self.user_id = None
         self.user_email = None
         self.known_words = set()
+        # Shown in the header; read once at login, reassign after a level change
+        self._cefr_level = "B1"
 
         # Page setup
         self.page.title = "AI Tutor ✨"
@@ -269,7 +339,10 @@ class AITutorApp:
                 except Exception:
                     self.known_words = set()
 
-            self.load_sessions()
+            # Sessions, profile etc. in one parallel batch
+            bundle = fetch_home_bundle(session_limit=50)
+            self.load_sessions(bundle["sessions"])
+            self._cefr_level = (bundle["profile"] or {}).get("cefr_level") or "B1"
         except Exception as e:
             print(f"Login success error: {e}")
 
@@ -280,9 +353,9 @@ class AITutorApp:
         else:
             self.add_welcome_message()
 
-    def load_sessions(self):
+    def load_sessions(self, sessions=None):
         try:
-            self.sessions = list_user_sessions(limit=50)
+            self.sessions = sessions if sessions is not None else list_user_sessions(limit=50)
             if self.sessions:
                 self.session_id = self.sessions[0]["id"]
             else:
@@ -292,29 +365,67 @@ class AITutorApp:
             print(f"Load sessions error: {e}")
             self.sessions = []
             self.session_id = None
+            return
+
+        # Likely next clicks: fetch them while the user is still looking
+        others = [s["id"] for s in self.sessions if s["id"] != self.session_id]
+        self._msg_prefetch = prefetch_messages(others[:3], limit=200)
 
-    def load_messages(self):
+    def load_messages(self, msgs=None):
         if not self.session_id or not IMPORTS_OK:
             return
 
         try:
-            msgs = list_messages(self.session_id, limit=200)
-            self.messages.clear()
-            self.chat_list.controls.clear()
-
-            for m in msgs:
-                msg = Message(
+            if msgs is None:
+                msgs = list_messages(self.session_id, limit=200)
+            self.messages[:] = [
+                Message(
                     sender="user" if m.get("role") == "user" else "tutor",
                     text=m.get("content", ""),
                     msg_id=m.get("id"),
                 )
-                self.messages.append(msg)
-                self.chat_list.controls.append(self.create_bubble(msg))
+                for m in msgs
+            ]
+
+            self._user_msg_count = sum(1 for m in msgs if m.get("role") == "user")
+
+            # Only the newest bubbles are built now, see on_chat_scroll
+            self._rendered_from = max(0, len(self.messages) - MESSAGE_WINDOW)
+            self.chat_list.controls[:] = [self._saved_bubble(m) for m in self.messages[self._rendered_from:]]
+            self.chat_list.auto_scroll = True
 
             self.page.update()
         except Exception as e:
             print(f"Load messages error: {e}")
 
+    def _saved_bubble(self, msg: Message):
+        """Bubble for a message of the current session, reused from earlier visits."""
+        if msg.id is None:
+            return self.create_bubble(msg)
+        bubbles = self._bubble_cache.get(self.session_id)
+        if bubbles is None:
+            bubbles = self._bubble_cache[self.session_id] = {}
+            if len(self._bubble_cache) > BUBBLE_CACHE_SESSIONS:
+                self._bubble_cache.popitem(last=False)
+        else:
+            self._bubble_cache.move_to_end(self.session_id)
+        bubble = bubbles.get(msg.id)
+        if bubble is None:
+            bubble = bubbles[msg.id] = self.create_bubble(msg)
+        return bubble
+
+    def on_chat_scroll(self, e):
+        """Near the top of the chat: add the next MESSAGE_WINDOW older bubbles."""
+        if self._rendered_from <= 0 or e.pixels is None or e.pixels > 200:
+            return
+        start = max(0, self._rendered_from - MESSAGE_WINDOW)
+        older = [self._saved_bubble(m) for m in self.messages[start:self._rendered_from]]
+        self._rendered_from = start
+        # Don't jump back to the newest message while reading history
+        self.chat_list.auto_scroll = False
+        self.chat_list.controls[0:0] = older
+        self.page.update()
+
     # -----------------------------
     # UI BUILD
     # -----------------------------
@@ -325,6 +436,7 @@ class AITutorApp:
             spacing=8,
             padding=PadAll(20),
             auto_scroll=True,
+            on_scroll=self.on_chat_scroll,
         )
 
         # Typing indicator
@@ -396,14 +508,7 @@ class AITutorApp:
         self.persona_dropdown.on_change = self.on_persona_change
 
         # Level badge
-        user_level = "B1"
-        if IMPORTS_OK:
-            try:
-                profile = get_current_profile()
-                if profile and profile.get("cefr_level"):
-                    user_level = profile["cefr_level"]
-            except Exception:
-                pass
+        user_level = self._cefr_level
 
         header = ft.Container(
             content=ft.Row(
@@ -518,20 +623,21 @@ class AITutorApp:
     def create_bubble(self, msg: Message):
         is_user = msg.sender == "user"
 
-        avatar = emoji_badge("🙂" if is_user else "🤖", "#168aad" if is_user else "#52b69a", size=16, box=36)
+        avatar = emoji_badge(*(_USER_AVATAR if is_user else _TUTOR_AVATAR), size=16, box=36)
 
+        msg.text_control = ft.Text(msg.text, color="#184e77", size=14, selectable=True)
         bubble = ft.Container(
             content=ft.Column(
                 [
-                    ft.Text(msg.text, color="#184e77", size=14, selectable=True),
-                    ft.Text(msg.timestamp.strftime("%H:%M") if msg.timestamp else "", color="#888", size=10),
+                    msg.text_control,
+                    ft.Text(msg.time_str, color="#888", size=10),
                 ],
                 spacing=4,
             ),
             bgcolor="white",
             border_radius=18,
-            padding=PadSymmetric(horizontal=14, vertical=12),
-            shadow=ft.BoxShadow(blur_radius=8, color="#00000012", offset=ft.Offset(0, 2)),
+            padding=_BUBBLE_PADDING,
+            shadow=_BUBBLE_SHADOW,
         )
 
         if is_user:
@@ -540,7 +646,7 @@ class AITutorApp:
                     [ft.Container(expand=True), bubble, ft.Container(width=8), avatar],
                     vertical_alignment=ft.CrossAxisAlignment.END,
                 ),
-                padding=PadSymmetric(horizontal=16, vertical=4),
+                padding=_ROW_PADDING,
             )
         else:
             return ft.Container(
@@ -548,7 +654,7 @@ class AITutorApp:
                     [avatar, ft.Container(width=8), bubble, ft.Container(expand=True)],
                     vertical_alignment=ft.CrossAxisAlignment.END,
                 ),
-                padding=PadSymmetric(horizontal=16, vertical=4),
+                padding=_ROW_PADDING,
             )
 
     # ============================================
@@ -615,7 +721,7 @@ class AITutorApp:
                 border_radius=10,
                 padding=PadAll(8),
                 border=ft.border.all(1, "#b5e48c") if is_active else None,
-                on_click=lambda e, sid=s["id"]: self.switch_session(sid),
+                on_click=lambda e, sid=s["id"]: self.page.run_task(self.switch_session, sid),
                 data=s["id"],
             )
             self.session_list.controls.append(item)
@@ -628,16 +734,19 @@ class AITutorApp:
         if not text:
             return
 
+        # Input, user bubble and typing indicator go out in one update
         self.msg_input.value = ""
-        self.page.update()
 
         user_msg = Message("user", text)
         self.messages.append(user_msg)
+        self._user_msg_count += 1
+        self.chat_list.auto_scroll = True
         self.chat_list.controls.append(self.create_bubble(user_msg))
 
         if IMPORTS_OK and self.session_id:
             try:
-                add_message(self.session_id, "user", text)
+                # Saved together with the reply (add_message_async flushes it)
+                queue_message(self.session_id, "user", text)
             except Exception as ex:
                 print(f"Save error: {ex}")
 
@@ -645,39 +754,67 @@ class AITutorApp:
         self.page.update()
 
         def build_prompt():
-            prompt = text
-            if self.current_topic != "Free Chat":
-                topic_prompt = TOPIC_PROMPTS.get(self.current_topic, "")
-                prompt = f"[TOPIC: {self.current_topic}]\n{topic_prompt}\n\n{text}"
-            if self.current_persona != "Default":
-                style = PERSONA_STYLES.get(self.current_persona, "")
-                prompt = f"[STYLE: {style}]\n\n{prompt}"
-            return prompt
+            return self._prompt_prefix + text
+
+        session_id = self.session_id
+        ai_msg = Message("tutor", "")
+        interrupted = False
+
+        def show_reply(reply: str) -> bool:
+            # The bubble appears with the first text; nothing if the user left the chat.
+            # Only mutates the controls, the caller decides when to update the page.
+            if self.session_id != session_id:
+                return False
+            if ai_msg.text_control is None:
+                self.typing_indicator.visible = False
+                self.messages.append(ai_msg)
+                self.chat_list.controls.append(self.create_bubble(ai_msg))
+            ai_msg.text = reply
+            ai_msg.text_control.value = reply
+            return True
 
         def get_response_sync():
-            if self.engine:
-                try:
-                    return self.engine.ask(build_prompt(), session_id=self.session_id)
-                except Exception as ex:
-                    return f"⚠️ Engine error: {ex}"
-            return f"Demo response to: {text}"
+            nonlocal interrupted
+            if not self.engine:
+                return f"Demo response to: {text}"
+            ask_stream = getattr(self.engine, "ask_stream", None)
+            try:
+                if ask_stream is None:
+                    return self.engine.ask(build_prompt(), session_id=session_id)
+                # Show tokens as they arrive (at most ~30 UI updates per second)
+                parts: list[str] = []
+                last_update = 0.0
+                for delta in ask_stream(build_prompt(), session_id=session_id):
+                    parts.append(delta)
+                    now = time.monotonic()
+                    if now - last_update >= 0.033:
+                        if show_reply("".join(parts)):
+                            self.page.update()
+                        last_update = now
+                return "".join(parts)
+            except ReplyInterrupted as ex:
+                # Show what arrived, but don't save a broken reply as the answer
+                interrupted = True
+                return "".join(parts) + f"\n\n⚠️ Reply interrupted ({ex})"
+            except Exception as ex:
+                return f"⚠️ Engine error: {ex}"
 
         loop = asyncio.get_event_loop()
         response = await loop.run_in_executor(None, get_response_sync)
 
         self.typing_indicator.visible = False
+        show_reply(response)
+        self.page.update()
 
-        ai_msg = Message("tutor", response)
-        self.messages.append(ai_msg)
-        self.chat_list.controls.append(self.create_bubble(ai_msg))
-
-        if IMPORTS_OK and self.session_id:
+        if IMPORTS_OK and session_id and interrupted:
+            flush_messages()  # the user's message is still saved
+        elif IMPORTS_OK and session_id:
             try:
-                add_message(self.session_id, "assistant", response)
-            except Exception:
-                pass
-
-        self.page.update()
+                # The reply is already shown; wait for the save only to report it
+                await asyncio.wrap_future(add_message_async(session_id, "assistant", response))
+            except Exception as ex:
+                print(f"Save error: {ex}")
+                self.page.open(ft.SnackBar(ft.Text("Could not save this message.")))
 
     def new_chat(self, e):
         if IMPORTS_OK:
@@ -694,19 +831,42 @@ class AITutorApp:
 
         self.refresh_session_list()
         self.messages.clear()
+        self._user_msg_count = 0
         self.chat_list.controls.clear()
+        self._rendered_from = 0
         self.add_welcome_message()
         self.page.update()
 
-    def switch_session(self, session_id: int):
+    async def switch_session(self, session_id: int):
         self.session_id = session_id
         self.refresh_session_list()
 
         if IMPORTS_OK:
-            self.load_messages()
+            # Highlight the new session now, fetch its messages off the UI thread
+            self.page.update()
+            msgs = None
+            fut = self._msg_prefetch.pop(session_id, None)
+            if fut is not None:
+                try:
+                    # Already running: wait for it without blocking the event loop
+                    msgs = await asyncio.wrap_future(fut)
+                except Exception:
+                    msgs = None  # failed: fetch live
+            if msgs is None:
+                loop = asyncio.get_event_loop()
+                try:
+                    msgs = await loop.run_in_executor(self._db_pool, list_messages, session_id, 200)
+                except Exception as ex:
+                    print(f"Load messages error: {ex}")
+                    return
+            if self.session_id != session_id:
+                return  # another session was picked meanwhile
+            self.load_messages(msgs)
         else:
             self.messages.clear()
+            self._user_msg_count = 0
             self.chat_list.controls.clear()
+            self._rendered_from = 0
             self.add_welcome_message()
 
         self.page.update()
@@ -716,6 +876,7 @@ class AITutorApp:
             return
         try:
             delete_session(session_id)
+            self._bubble_cache.pop(session_id, None)
             self.sessions = list_user_sessions(limit=50)
 
             if self.session_id == session_id:
@@ -734,11 +895,18 @@ class AITutorApp:
     def toggle_mic(self, e):
         self.page.open(ft.SnackBar(ft.Text("Mic feature coming soon!")))
 
+    def _rebuild_prefix(self):
+        key = (self.current_topic, self.current_persona)
+        prefix = PROMPT_PREFIXES.get(key)
+        self._prompt_prefix = prefix if prefix is not None else _prompt_prefix(*key)
+
     def on_topic_change(self, e):
         self.current_topic = self.topic_dropdown.value
+        self._rebuild_prefix()
 
     def on_persona_change(self, e):
         self.current_persona = self.persona_dropdown.value
+        self._rebuild_prefix()
 
     def logout(self, e):
         if IMPORTS_OK:
@@ -795,7 +963,7 @@ class AITutorApp:
 
     def show_summary(self, e):
         msg_count = len(self.messages)
-        user_msgs = sum(1 for m in self.messages if m.sender == "user")
+        user_msgs = self._user_msg_count
         content = f"This session:\n• Total messages: {msg_count}\n• Your messages: {user_msgs}"
 
         dialog = ft.AlertDialog(
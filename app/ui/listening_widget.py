@@ -2,7 +2,7 @@
 
 import os
 from PySide6 import QtWidgets, QtCore, QtMultimedia
-from app.listening_quiz_data import LISTENING_QUIZZES
+from app.listening_quiz_data import get_quiz, quiz_titles
 from app.services.user_profile import get_user_level
 
 # Disable ffmpeg spam
@@ -120,11 +120,10 @@ class ListeningPracticeWidget(QtWidgets.QWidget):
     # Quiz picker
     # ----------------------------------------------------
     def _pick_quiz(self, level):
-        if level in LISTENING_QUIZZES and LISTENING_QUIZZES[level]:
-            return LISTENING_QUIZZES[level][0]
-        for lvl in LEVELS:
-            if LISTENING_QUIZZES.get(lvl):
-                return LISTENING_QUIZZES[lvl][0]
+        for lvl in (level, *LEVELS):
+            titles = quiz_titles(lvl)
+            if titles:
+                return get_quiz(lvl, titles[0][0])
         return None
 
     # ----------------------------------------------------
@@ -1,6 +1,7 @@
 import sys
 import re
 import threading
+import time
 import urllib.parse
 from collections import Counter
 
@@ -20,7 +21,9 @@ from app.modules.vocab_store import get_known_words_set, add_word
 # ✨ Supabase chat persistence + profile + learning events
 from app.services.db_supabase import (
     get_or_create_default_session,
-    add_message,
+    add_message_async,
+    queue_message,
+    flush_messages,
     list_messages,
     list_user_sessions,
     create_session,
@@ -34,6 +37,7 @@ from app.services.db_supabase import (
 
 # Azure STT
 from app.engines.cloud_stt_azure import AzureSTTEngine as STTEngine
+from app.engines.gemini_engine import ReplyInterrupted
 
 try:
     from app.engines.pron_eval import flag_tricky_words
@@ -43,6 +47,51 @@ except Exception:
 
 LANG_TAGS = ("[en-US]", "[tr-TR]", "[en-GB]", "[tr]", "[en]")
 
+# Tone instructions per persona, keyed by the first word of the persona label
+PERSONA_STYLES = {
+    "neutral": (
+        "Use a clear, helpful, and neutral tone. "
+        "Focus on explaining concepts accurately without emotional emphasis."
+    ),
+    "friendly": (
+        "Be genuinely warm, cheerful, and encouraging. "
+        "Use simple, positive language and light emojis occasionally 😊. "
+        "Sound like a supportive and friendly tutor."
+    ),
+    "gentle": (
+        "Always respond in English. "
+        "Speak in a soft, warm, and emotionally caring tone. "
+        "Occasionally use gentle English terms of endearment such as "
+        "'my dear', 'dear', or 'sweet one' in a respectful and supportive way. "
+        "You may use heart emojis (💗, 💕) sparingly to express care and reassurance. "
+        "Keep a calm, slow, and soothing pace. "
+        "Remain focused on learning and emotional support."
+    ),
+    "formal": (
+        "Use a formal, academic, and professional tone. "
+        "Speak clearly and precisely, like a university instructor. "
+        "Use well-structured sentences and correct terminology. "
+        "Avoid emojis, slang, jokes, or casual expressions. "
+        "Remain objective, calm, and respectful at all times."
+    ),
+    "coach": (
+        "Act like a high-energy language coach. "
+        "Be very motivating, confident, and direct. "
+        "Use short, punchy sentences. "
+        "Push the user forward with encouragement and momentum. "
+        "Give quick examples, then challenge the user to try immediately. "
+        "Use motivational emojis like 💪🔥 occasionally. "
+        "Always end with a call to action."
+    ),
+    "comedian": (
+        "Use a light, humorous, and friendly tone. "
+        "Make small jokes or playful remarks occasionally to keep the mood relaxed. "
+        "Use funny expressions or mild exaggeration to feel more human and approachable. "
+        "You may use emojis like 😄😅 sparingly. "
+        "Never distract from learning, and avoid sarcasm or excessive jokes."
+    ),
+}
+
 
 def strip_lang_tags(s: str) -> str:
     out = s
@@ -78,8 +127,10 @@ def run_placement_test_if_needed(parent_widget: QtWidgets.QWidget) -> None:
 
 class MainWindow(QtWidgets.QMainWindow):
     bot_text_signal = QtCore.Signal(str)
+    bot_partial_signal = QtCore.Signal(str)  # streaming reply so far
     stt_text_signal = QtCore.Signal(str, bool, list)
     vocab_explained_signal = QtCore.Signal(str, str)  # word, explanation
+    save_error_signal = QtCore.Signal(str)  # a chat message could not be saved
 
     def __init__(self, engine, parent=None):
         super().__init__(parent)
@@ -773,6 +824,8 @@ QDialog QLineEdit, QInputDialog QLineEdit {
         # ---------- Signals ----------
         self.input.returnPressed.connect(self._on_enter)
         self.bot_text_signal.connect(self._append_bot)
+        self.bot_partial_signal.connect(self.history.stream_bot)
+        self.save_error_signal.connect(self._on_save_error)
         self.stt_text_signal.connect(self._on_stt)
 
         # ---------- STT ----------
@@ -1772,7 +1825,8 @@ QDialog QLineEdit, QInputDialog QLineEdit {
         self._append_user_with_grammar(text)
 
         try:
-            add_message(self.session_id, role="user", content=text)
+            # Saved together with the reply (add_message_async flushes it)
+            queue_message(self.session_id, role="user", content=text)
         except Exception as e:
             self.history.append(f"<p><i>Save error (user): {e}</i></p>")
 
@@ -1786,58 +1840,7 @@ QDialog QLineEdit, QInputDialog QLineEdit {
         if persona_key == "none":
             persona_key = "neutral"
 
-        # Find topic context
-        context = ""
-        for cat, topics in self.topic_prompts.items():
-            if topic in topics:
-                context = topics[topic]
-                break
-
-        persona_styles = {
-            "neutral": (
-                "Use a clear, helpful, and neutral tone. "
-                "Focus on explaining concepts accurately without emotional emphasis."
-            ),
-            "friendly": (
-                "Be genuinely warm, cheerful, and encouraging. "
-                "Use simple, positive language and light emojis occasionally 😊. "
-                "Sound like a supportive and friendly tutor."
-            ),
-            "gentle": (
-                "Always respond in English. "
-                "Speak in a soft, warm, and emotionally caring tone. "
-                "Occasionally use gentle English terms of endearment such as "
-                "'my dear', 'dear', or 'sweet one' in a respectful and supportive way. "
-                "You may use heart emojis (💗, 💕) sparingly to express care and reassurance. "
-                "Keep a calm, slow, and soothing pace. "
-                "Remain focused on learning and emotional support."
-            ),
-            "formal": (
-                "Use a formal, academic, and professional tone. "
-                "Speak clearly and precisely, like a university instructor. "
-                "Use well-structured sentences and correct terminology. "
-                "Avoid emojis, slang, jokes, or casual expressions. "
-                "Remain objective, calm, and respectful at all times."
-            ),
-            "coach": (
-                "Act like a high-energy language coach. "
-                "Be very motivating, confident, and direct. "
-                "Use short, punchy sentences. "
-                "Push the user forward with encouragement and momentum. "
-                "Give quick examples, then challenge the user to try immediately. "
-                "Use motivational emojis like 💪🔥 occasionally. "
-                "Always end with a call to action."
-            ),
-            "comedian": (
-                "Use a light, humorous, and friendly tone. "
-                "Make small jokes or playful remarks occasionally to keep the mood relaxed. "
-                "Use funny expressions or mild exaggeration to feel more human and approachable. "
-                "You may use emojis like 😄😅 sparingly. "
-                "Never distract from learning, and avoid sarcasm or excessive jokes."
-            ),
-        }
-
-        style_instr = persona_styles.get(persona_key, persona_styles["neutral"])
+        style_instr = PERSONA_STYLES.get(persona_key, PERSONA_STYLES["neutral"])
 
         # Instead of overwriting the whole system prompt, we prepend a short tag
         engine_input = (
@@ -1848,11 +1851,31 @@ QDialog QLineEdit, QInputDialog QLineEdit {
 
         def worker():
             # pass session_id for learning_events etc.
-            reply = self.engine.ask(engine_input, session_id=self.session_id)
+            ask_stream = getattr(self.engine, "ask_stream", None)
+            if ask_stream is None:
+                reply = self.engine.ask(engine_input, session_id=self.session_id)
+            else:
+                # Show tokens as they arrive (at most ~20 UI updates per second)
+                parts: list[str] = []
+                last_emit = 0.0
+                try:
+                    for delta in ask_stream(engine_input, session_id=self.session_id):
+                        parts.append(delta)
+                        now = time.monotonic()
+                        if now - last_emit >= 0.05:
+                            self.bot_partial_signal.emit("".join(parts))
+                            last_emit = now
+                except ReplyInterrupted as e:
+                    # Show what arrived, but don't save a broken reply as the answer
+                    self.bot_text_signal.emit("".join(parts) + f"\n\n⚠️ Reply interrupted ({e})")
+                    flush_messages()  # the user's message is still saved
+                    return
+                reply = "".join(parts)
             try:
-                add_message(self.session_id, role="assistant", content=reply)
-            except Exception:
-                pass
+                fut = add_message_async(self.session_id, role="assistant", content=reply)
+                fut.add_done_callback(self._check_saved)
+            except Exception as e:
+                self.save_error_signal.emit(str(e))
             self.bot_text_signal.emit(reply)
 
         threading.Thread(target=worker, daemon=True).start()
@@ -2189,6 +2212,14 @@ Top problematic words/phrases: {top_words}
 
         self.history.append_bot(text, new_words)
 
+    def _check_saved(self, fut):
+        # Runs on the writer thread; the history is updated via the signal
+        if fut.exception() is not None:
+            self.save_error_signal.emit(str(fut.exception()))
+
+    def _on_save_error(self, error: str):
+        self.history.append(f"<p><i>Save error: {error}</i></p>")
+
     def _append_bot_simple(self, text: str):
         """Append bot message without vocabulary highlighting (for system messages)."""
         self.history.append_bot(text, [])
@@ -595,12 +595,32 @@ class VocabBrowser(QtWidgets.QScrollArea):
             if w and str(w).strip():
                 self._new_words.add(str(w).strip().lower())
 
-        if self._messages and self._messages[-1].get("type") == "thinking":
+        if self._messages and (
+            self._messages[-1].get("type") == "thinking" or self._messages[-1].get("streaming")
+        ):
             self._messages.pop()
 
         self._messages.append({"type": "tutor", "content": text})
         self._rebuild_all()
 
+    def stream_bot(self, text: str) -> None:
+        """Show a partial tutor reply while it streams in; append_bot() finalizes it."""
+        last = self._messages[-1] if self._messages else None
+        if last is not None and last.get("streaming") and self._bubbles:
+            # Update only the last bubble instead of rebuilding the whole chat
+            last["content"] = text
+            bubble = self._bubbles[-1].findChild(MessageBubble)
+            if bubble is not None:
+                bubble.content_label.setHtml(self._format_text(text))
+                bubble._sync_doc_height()
+                self._scroll_to_bottom()
+                return
+
+        if last is not None and last.get("type") == "thinking":
+            self._messages.pop()
+        self._messages.append({"type": "tutor", "content": text, "streaming": True})
+        self._rebuild_all()
+
     # compatibility
     def anchorAt(self, pos) -> str:
         return ""